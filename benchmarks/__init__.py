@@ -0,0 +1,2 @@
+# Micro-benchmarks for the core/ helpers. Run from the repo root, e.g.
+#     python -m benchmarks.fingerprint
@@ -0,0 +1,82 @@
+# ./benchmarks/downsample.py
+"""
+Line downsampling: points, payload and shape error of LTTB and min-max.
+
+    python -m benchmarks.downsample [--points 1000]
+
+Checks `lttb_indices` against a straightforward per-bucket reference
+implementation, then downsamples a fine KDE curve and a noisy random walk
+with spikes. The shape error is the largest gap between the original line
+and the downsampled one (linearly interpolated), as a share of the y range.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.charts import downsample, kde_density, lttb_indices
+
+
+def reference_lttb(x, y, n_out):
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            nlo, nhi = n - 1, n
+        mx, my = np.mean(x[nlo:nhi]), np.mean(y[nlo:nhi])
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - mx) * (y[j] - y[a]) - (x[a] - x[j]) * (my - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    return np.array(out + [n - 1])
+
+
+def _series(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    data = rng.gamma(2.0, 3.0, 200_000)
+    xs = np.linspace(data.min(), data.max(), 20_000)
+    walk = np.cumsum(rng.normal(size=1_000_000))
+    walk[rng.choice(len(walk), 20)] += 80  # isolated spikes
+    return {
+        "kde curve (20k points)": (xs, kde_density(data, xs, engine="fft")),
+        "random walk with spikes (1M points)": (np.arange(len(walk), dtype=float), walk),
+    }
+
+
+def _shape_error(x, y, dx, dy) -> float:
+    return float(np.abs(np.interp(x, dx, dy) - y).max() / (y.max() - y.min()))
+
+
+def main(points: int) -> None:
+    rng = np.random.default_rng(1)
+    for n in (50, 1_001, 5_000):
+        x, y = np.sort(rng.uniform(0, 1, n)), rng.normal(size=n)
+        assert np.array_equal(lttb_indices(x, y, 40), reference_lttb(x, y, 40)), n
+    print("lttb_indices matches the reference implementation\n")
+
+    for name, (x, y) in _series().items():
+        full = len(json.dumps(list(zip(x.tolist(), y.tolist()))))
+        print(f"{name}: {len(x):,} points, {full / 1024:,.0f} KB")
+        for method in ("lttb", "minmax"):
+            t0 = time.perf_counter()
+            dx, dy = downsample(x, y, points, method)
+            secs = time.perf_counter() - t0
+            size = len(json.dumps(list(zip(dx.tolist(), dy.tolist()))))
+            kept_max = dy.max() == y.max()
+            print(f"  {method:<7} {len(dx):>6,} points {size / 1024:>8,.0f} KB {secs * 1000:>8,.1f} ms"
+                  f"  shape error {_shape_error(x, y, dx, dy):.1%}  global max kept: {kept_max}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.points)
@@ -0,0 +1,61 @@
+# ./benchmarks/fingerprint.py
+"""
+Fingerprinting cost vs. rebuilding a chart option.
+
+    python -m benchmarks.fingerprint [--rows 10000000]
+
+Times `core.fingerprint.fingerprint` on the columns a chart reads (exact and
+sampled), hashing the whole frame with `pd.util.hash_pandas_object` (what a
+naive cache key costs), and building the bar/histogram options from scratch.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.charts import build_bar_option, build_histogram_option
+from core.fingerprint import fingerprint
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "county": pd.Categorical.from_codes(rng.integers(0, 26, rows), [f"County {i}" for i in range(26)]),
+        "los": rng.gamma(2.0, 3.0, rows),
+        "age": rng.integers(0, 100, rows),
+        "ward": rng.integers(0, 500, rows).astype(str),  # object column the charts don't read
+    })
+
+
+def main(rows: int) -> None:
+    df = make_frame(rows)
+    print(f"{rows:,} rows, {df.memory_usage(deep=True).sum() / 2 ** 20:,.0f} MiB\n")
+
+    cases = [
+        ("fingerprint(df, ['county', 'los'])", lambda: fingerprint(df, ["county", "los"])),
+        ("fingerprint(df, ['los'], sample=100_000)", lambda: fingerprint(df, ["los"], sample=100_000)),
+        ("hash_pandas_object(df) (whole frame)", lambda: pd.util.hash_pandas_object(df).to_numpy().sum()),
+        ("build_histogram_option (uncached)", lambda: build_histogram_option.__wrapped__(df, "los", bins=30)),
+        ("build_bar_option hue groupby (uncached)",
+         lambda: build_bar_option.__wrapped__(df, "county", "los", hue="age")),
+        ("build_histogram_option (cache hit)", lambda: build_histogram_option(df, "los", bins=30)),
+    ]
+    for label, fn in cases:
+        print(f"{label:<45} {_time(fn) * 1000:>10,.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    main(parser.parse_args().rows)
@@ -0,0 +1,74 @@
+# ./benchmarks/importtime.py
+"""
+Cold import cost of the portfolio modules, read from ``python -X importtime``.
+
+    python -m benchmarks.importtime [--module core.charts] [--repeat 3] [--budget MS] [--fail]
+
+Each module is imported in a fresh interpreter (--repeat times, best kept).
+The report gives its cumulative import time, the heaviest packages it pulls
+in, and any of LAZY that got imported at module level: those must only load
+when the feature needing them runs (`load_geojson`, `GIS`, `ECharts.kde`,
+the Barnes-Hut schematic, the CycleGAN image fetch). With --fail the exit
+code is non-zero when a lazy dependency leaks in or a module is over
+--budget milliseconds.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+MODULES = ["core.charts", "core", "sections"]
+# plotly is not listed: streamlit itself imports it for its chart theme
+LAZY = ["geopandas", "scipy", "requests", "seaborn", "matplotlib"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_profile(module: str) -> list[tuple[str, int, int]]:
+    """(package, depth, cumulative us) for every import made by `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), len(m.group(3)) // 2, int(m.group(2))))
+    return rows
+
+
+def best_profile(module: str, repeat: int) -> list[tuple[str, int, int]]:
+    runs = [import_profile(module) for _ in range(repeat)]
+    return min(runs, key=lambda rows: next(us for name, _, us in rows if name == module))
+
+
+def main(modules: list[str], repeat: int, budget: float | None, top: int) -> int:
+    failures = 0
+    for module in modules:
+        rows = best_profile(module, repeat)
+        total_ms = next(us for name, _, us in rows if name == module) / 1000
+        leaked = sorted({name.split(".")[0] for name, _, _ in rows} & set(LAZY))
+        over = budget is not None and total_ms > budget
+        failures += bool(leaked) + over
+
+        flag = "  OVER BUDGET" if over else ""
+        print(f"{module}: {total_ms:,.0f} ms{flag}")
+        # heaviest packages loaded on the way (top-level names, whatever imported them first)
+        heaviest = sorted(((us, name) for name, _, us in rows if "." not in name and name != module), reverse=True)
+        for us, name in heaviest[:top]:
+            print(f"  {name:<30} {us / 1000:>10,.1f} ms")
+        print(f"  lazy dependencies imported: {', '.join(leaked) or 'none'}")
+        print()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="module to import (repeatable; default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=None, help="per-module budget in ms")
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages listed per module")
+    parser.add_argument("--fail", action="store_true", help="exit non-zero on a leak or an over-budget module")
+    args = parser.parse_args()
+    failed = main(args.module or MODULES, args.repeat, args.budget, args.top)
+    sys.exit(1 if args.fail and failed else 0)
@@ -0,0 +1,76 @@
+# ./benchmarks/palette.py
+"""
+Colour resolution: per-call matplotlib/colorsys work vs. the memoised tables
+in `core.palette`.
+
+    python -m benchmarks.palette [--nodes 50000] [--calls 200]
+
+* colormap: `GIS.plot(cmap=name)` converting the sampled colormap colour by
+  colour on every call, against `colormap_hex`;
+* sunburst: one `colorsys` lighten per node (what a per-node colour walk
+  costs), against one `depth_palette` lookup per node.
+
+Both pairs are checked for identical colours before timing.
+"""
+
+import argparse
+import colorsys
+import time
+
+import matplotlib
+import numpy as np
+from matplotlib import colors as mcolors
+
+from core.palette import colormap_hex, depth_palette
+
+CMAPS = ["viridis", "YlOrRd", "Blues", "coolwarm"]
+BASE = "#5470C6"
+LEVELS = 3
+
+
+def colorsys_lighten(hex_color: str, fraction: float) -> str:
+    hex_color = hex_color.lstrip('#')
+    r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+    h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+    l = min(1, l + fraction * (1 - l))
+    nr, ng, nb = colorsys.hls_to_rgb(h, l, s)
+    return f"#{int(nr * 255):02x}{int(ng * 255):02x}{int(nb * 255):02x}"
+
+
+def per_call_cmap(name: str, steps: int) -> list:
+    m = matplotlib.colormaps[name].resampled(steps)
+    return [mcolors.to_hex(m(i)) for i in range(m.N)]
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(nodes: int, calls: int) -> None:
+    for name in CMAPS:
+        assert list(colormap_hex(name, 7)) == per_call_cmap(name, 7), name
+    depths = np.random.default_rng(0).integers(0, LEVELS, nodes).tolist()
+    palette = depth_palette(BASE, LEVELS)
+    assert [palette[d] for d in depths] == [colorsys_lighten(BASE, d / LEVELS) for d in depths]
+
+    t_cmap_slow = _timed(lambda: [per_call_cmap(CMAPS[i % len(CMAPS)], 7) for i in range(calls)])
+    t_cmap_fast = _timed(lambda: [colormap_hex(CMAPS[i % len(CMAPS)], 7) for i in range(calls)])
+    t_node_slow = _timed(lambda: [colorsys_lighten(BASE, d / LEVELS) for d in depths])
+    t_node_fast = _timed(lambda: [depth_palette(BASE, LEVELS)[d] for d in depths])
+
+    print(f"colormap, {calls} GIS.plot calls over {len(CMAPS)} names")
+    print(f"  to_hex per colour     {t_cmap_slow * 1000:>10,.1f} ms")
+    print(f"  colormap_hex (cached) {t_cmap_fast * 1000:>10,.1f} ms")
+    print(f"sunburst, {nodes:,} nodes over {LEVELS} depths")
+    print(f"  colorsys per node     {t_node_slow * 1000:>10,.1f} ms")
+    print(f"  depth_palette lookup  {t_node_fast * 1000:>10,.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    main(args.nodes, args.calls)
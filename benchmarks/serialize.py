@@ -0,0 +1,69 @@
+# ./benchmarks/serialize.py
+"""
+Wire size of chart options before and after `compact_option`.
+
+    python -m benchmarks.serialize [--rows 20000] [--digits 6]
+
+Builds a few representative options and reports their JSON size as the
+builders return them and once compacted, with the compaction time and the
+largest relative change of any number. Only plotted coordinates (the KDE
+curves, GIS lon/lat) are rounded by default; the pie and histogram rows show
+what passing `digits` to those charts would save.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.charts import (build_histogram_option, build_kde_option, build_pie_option, columnar_dataset,
+                         compact_option, option_size, _scatter_data)
+
+
+def _numbers(obj):
+    if isinstance(obj, dict):
+        for v in obj.values():
+            yield from _numbers(v)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            yield from _numbers(v)
+    elif isinstance(obj, float):
+        yield obj
+
+
+def _options(rows: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"los": rng.gamma(2.0, 3.0, rows), "ward": rng.choice(list("ABCDEF"), rows),
+                       "name": [f"item {i}" for i in range(rows)], "share": rng.random(rows) * 100,
+                       "lon": rng.uniform(-10.5, -6.0, rows), "lat": rng.uniform(51.4, 55.4, rows)})
+    return {
+        "kde, 6 hues x 200 points": build_kde_option(df, "los", hue="ward", show_metrics=True),
+        "kde, 6 hues x 1000 points": build_kde_option(df, "los", hue="ward", grid_size=1000),
+        f"pie, {rows:,} slices": build_pie_option(df, "name", "share"),
+        f"GIS scatter, {rows:,} points": {"series": [{"type": "scatter", "data": _scatter_data(df, "lon", "lat", "share")}]},
+        f"GIS scatter dataset, {rows:,} points": {"dataset": [columnar_dataset(df[["lon", "lat", "share"]])]},
+        "histogram, 50 bins (density)": build_histogram_option(df, "los", bins=50, density=True),
+    }
+
+
+def main(rows: int, digits: int) -> None:
+    print(f"{'option':<38}{'raw KB':>10}{'compact KB':>12}{'ratio':>8}{'ms':>8}{'max rel err':>13}")
+    for name, option in _options(rows).items():
+        t0 = time.perf_counter()
+        compact = compact_option(option, digits)
+        ms = (time.perf_counter() - t0) * 1000
+        raw, small = option_size(option), option_size(compact)
+        before = np.array(list(_numbers(json.loads(json.dumps(option)))))
+        after = np.array(list(_numbers(compact)) or [0.0])
+        err = np.max(np.abs(after - before) / np.maximum(np.abs(before), 1e-300)) if len(before) == len(after) else float("nan")
+        print(f"{name:<38}{raw / 1024:>10,.1f}{small / 1024:>12,.1f}{raw / small:>7.1f}x{ms:>8.1f}{err:>13.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--digits", type=int, default=6)
+    args = parser.parse_args()
+    main(args.rows, args.digits)
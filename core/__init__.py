@@ -2,9 +2,15 @@ from . import charts
 from . import utils
 from . import cards
 from . import examples
+from . import media
+from . import payload
+from . import palette
 __all__ = [
     'charts',
     'utils',
     'cards',
-    'examples'
+    'examples',
+    'media',
+    'payload',
+    'palette'
 ]
\ No newline at end of file
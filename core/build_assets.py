@@ -0,0 +1,170 @@
+# ./core/build_assets.py
+"""
+Offline asset build. Run from the repo root:
+
+    python -m core.build_assets [--force]
+
+  * GIFs               -> WEBM (VP9) + MP4 (H.264, faststart) at width steps,
+                          plus a WebP poster of the first frame
+  * MP4 / WEBM         -> a WebP poster frame
+  * PNG / JPEG         -> width-stepped WebP renditions
+
+Everything is written to `core/references/build/` together with the
+`manifest.json` that `core.media.lookup()` reads at render time, so
+`hero_video`, `center_gif` and `project_card` can pick the smallest rendition
+that covers their `max_width_px`. Entries record the source digest; an entry
+whose source has since changed is ignored until the next build.
+
+Needs Pillow. Video steps need `ffmpeg` on PATH (or the `imageio-ffmpeg`
+wheel) and are skipped with a warning without it.
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from core.media import MANIFEST_PATH, asset_digest, manifest_key
+
+BUILD_DIR = MANIFEST_PATH.parent
+SOURCE_DIRS = [Path("core/references/gifs"), Path("core/references/images"),
+               Path("core/references/Project Files")]
+
+IMAGE_WIDTHS = (240, 480, 800, 1200, 1600)
+VIDEO_WIDTHS = (480, 960)
+POSTER_MAX_WIDTH = 960
+
+
+def _ffmpeg() -> str | None:
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def _slug(path: Path) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", path.stem.lower()).strip("-")
+
+
+def _steps(widths, source_width: int) -> list[int]:
+    """Width steps narrower than the source, plus the source width itself."""
+    return sorted({w for w in widths if w < source_width} | {source_width})
+
+
+def _run(cmd: list[str]) -> None:
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def _save_webp(img: Image.Image, width: int, out: Path) -> None:
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+    if width < img.width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    img.save(out, "WEBP", quality=80, method=6)
+
+
+def build_image(src: Path, stem: str) -> dict:
+    with Image.open(src) as img:
+        entry = {"width": img.width, "height": img.height, "images": []}
+        for w in _steps(IMAGE_WIDTHS, img.width):
+            out = BUILD_DIR / f"{stem}-{w}w.webp"
+            _save_webp(img, w, out)
+            entry["images"].append({"width": w, "path": out.as_posix()})
+    return entry
+
+
+def build_gif(src: Path, stem: str, ffmpeg: str | None) -> dict:
+    with Image.open(src) as img:
+        img.seek(0)
+        entry = {"width": img.width, "height": img.height}
+        poster = BUILD_DIR / f"{stem}-poster.webp"
+        _save_webp(img.convert("RGBA"), min(img.width, POSTER_MAX_WIDTH), poster)
+        entry["poster"] = poster.as_posix()
+
+    if ffmpeg is None:
+        print(f"  ! no ffmpeg, keeping {src} as a GIF", file=sys.stderr)
+        return entry
+
+    entry["videos"] = []
+    for w in _steps(VIDEO_WIDTHS, entry["width"]):
+        w -= w % 2  # yuv420p needs even dimensions
+        scale = f"scale={w}:-2:flags=lanczos,format=yuv420p"
+        mp4 = BUILD_DIR / f"{stem}-{w}w.mp4"
+        webm = BUILD_DIR / f"{stem}-{w}w.webm"
+        _run([ffmpeg, "-y", "-i", str(src), "-vf", scale, "-an", "-c:v", "libx264", "-preset", "slow",
+              "-crf", "26", "-movflags", "+faststart", str(mp4)])
+        _run([ffmpeg, "-y", "-i", str(src), "-vf", scale, "-an", "-c:v", "libvpx-vp9", "-b:v", "0",
+              "-crf", "38", "-row-mt", "1", str(webm)])
+        entry["videos"].append({"width": w, "mp4": mp4.as_posix(), "webm": webm.as_posix()})
+    return entry
+
+
+def build_video(src: Path, stem: str, ffmpeg: str | None) -> dict:
+    if ffmpeg is None:
+        print(f"  ! no ffmpeg, no poster for {src}", file=sys.stderr)
+        return {}
+    with tempfile.TemporaryDirectory() as tmp:
+        frame = Path(tmp) / "frame.png"
+        _run([ffmpeg, "-y", "-i", str(src), "-frames:v", "1", str(frame)])
+        with Image.open(frame) as img:
+            poster = BUILD_DIR / f"{stem}-poster.webp"
+            _save_webp(img, min(img.width, POSTER_MAX_WIDTH), poster)
+            return {"width": img.width, "height": img.height, "poster": poster.as_posix()}
+
+
+def _outputs(entry: dict) -> list[str]:
+    paths = [entry["poster"]] if "poster" in entry else []
+    paths += [r["path"] for r in entry.get("images", [])]
+    paths += [p for r in entry.get("videos", []) for p in (r["mp4"], r["webm"])]
+    return paths
+
+
+def build(force: bool = False) -> dict:
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    ffmpeg = _ffmpeg()
+    old = json.loads(MANIFEST_PATH.read_text()) if MANIFEST_PATH.exists() else {"assets": {}}
+    assets = {}
+
+    for folder in SOURCE_DIRS:
+        for src in sorted(folder.rglob("*")):
+            ext = src.suffix.lower()
+            if ext not in (".gif", ".png", ".jpg", ".jpeg", ".mp4", ".webm"):
+                continue
+            key, digest = manifest_key(src), asset_digest(src)
+            prev = old["assets"].get(key)
+            if (not force and prev and prev.get("digest") == digest
+                    and all(Path(p).is_file() for p in _outputs(prev))):
+                assets[key] = prev
+                continue
+
+            print(f"building {key}")
+            stem = f"{_slug(src)}-{digest[:8]}"
+            if ext == ".gif":
+                entry = build_gif(src, stem, ffmpeg)
+            elif ext in (".mp4", ".webm"):
+                entry = build_video(src, stem, ffmpeg)
+            else:
+                entry = build_image(src, stem)
+            assets[key] = {"digest": digest, **entry}
+
+    manifest = {"version": 1, "assets": assets}
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="rebuild every asset, even unchanged ones")
+    args = parser.parse_args()
+    result = build(force=args.force)
+    print(f"wrote {MANIFEST_PATH} ({len(result['assets'])} assets)")
@@ -0,0 +1,136 @@
+# ./core/build_fonts.py
+"""
+Offline font build. Run from the repo root:
+
+    python -m core.build_fonts
+
+Subsets each TTF in `static/` that `.streamlit/config.toml` registers to the
+glyphs the portfolio uses (printable ASCII, common typography, and every
+character in the repo's .py/.md/.toml text), converts it to WOFF2 and
+writes `static/fonts/<name>.woff2` plus
+`static/fonts/fonts.css`: one `@font-face` per file with `font-display: swap`
+and the subset's `unicode-range`, so characters outside it fall back to a
+system font instead of an invisible one.
+
+`.streamlit/config.toml` points its `[[theme.fontFaces]]` at these files and
+`core.utils.inject_fonts()` sends the stylesheet and a preload hint. Re-run
+after adding copy with characters the subset does not cover.
+
+Needs fontTools and brotli (``pip install fonttools brotli``).
+"""
+
+import argparse
+import tomllib
+from pathlib import Path
+
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+SOURCE_DIR = Path("static")
+CONFIG = Path(".streamlit") / "config.toml"
+OUTPUT_DIR = SOURCE_DIR / "fonts"
+STYLESHEET = OUTPUT_DIR / "fonts.css"
+TEXT_DIRS = [Path("sections"), Path("core"), Path(".streamlit")]
+TEXT_FILES = [Path("main.py"), Path("README.md")]
+
+# printable ASCII, Latin-1 punctuation/accents, dashes, quotes, bullets, arrows
+BASE_CHARS = (
+    {chr(c) for c in range(0x20, 0x7F)}
+    | {chr(c) for c in range(0xA0, 0x100)}
+    | set("–—‘’‚“”„†•…′″‹›€™←↑→↓↗≈≠≤≥−×·✓")
+)
+
+
+def used_chars() -> set[str]:
+    """Characters of BASE_CHARS plus everything written in the repo's text files."""
+    chars = set(BASE_CHARS)
+    files = list(TEXT_FILES)
+    for folder in TEXT_DIRS:
+        files += [p for p in folder.rglob("*") if p.suffix in (".py", ".md", ".toml")]
+    for path in files:
+        if path.is_file():
+            chars |= set(path.read_text(encoding="utf-8", errors="ignore"))
+    return {c for c in chars if c.isprintable() or c == " "}
+
+
+def unicode_range(codepoints) -> str:
+    """CSS unicode-range for a set of code points, merged into spans."""
+    spans, start, prev = [], None, None
+    for cp in sorted(codepoints):
+        if start is None:
+            start = prev = cp
+        elif cp == prev + 1:
+            prev = cp
+        else:
+            spans.append((start, prev))
+            start = prev = cp
+    if start is not None:
+        spans.append((start, prev))
+    return ", ".join(f"U+{a:X}" if a == b else f"U+{a:X}-{b:X}" for a, b in spans)
+
+
+def configured_sources() -> list[Path]:
+    """`static/<name>.ttf` for every [[theme.fontFaces]] entry in config.toml."""
+    with open(CONFIG, "rb") as f:
+        faces = tomllib.load(f).get("theme", {}).get("fontFaces", [])
+    stems = dict.fromkeys(Path(face["url"]).stem for face in faces)  # keep order, drop repeats
+    return [SOURCE_DIR / f"{stem}.ttf" for stem in stems]
+
+
+def _face(font: TTFont) -> tuple[str, str, str]:
+    """(family, weight, style) for @font-face, read from the font's own tables."""
+    family = font["name"].getBestFamilyName().replace(" ", "")
+    style = "italic" if font["OS/2"].fsSelection & 1 else "normal"
+    if "fvar" in font:
+        axis = next((a for a in font["fvar"].axes if a.axisTag == "wght"), None)
+        if axis:
+            return family, f"{axis.minValue:g} {axis.maxValue:g}", style
+    return family, str(font["OS/2"].usWeightClass), style
+
+
+def build() -> list[dict]:
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    text = "".join(sorted(used_chars()))
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]   # keep kerning, ligatures, etc.
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+
+    faces = []
+    for src in configured_sources():
+        font = subset.load_font(str(src), options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        out = OUTPUT_DIR / f"{src.stem}.woff2"
+        subset.save_font(font, str(out), options)
+
+        family, weight, style = _face(font)
+        faces.append({"family": family, "weight": weight, "style": style, "path": out,
+                      "range": unicode_range(font.getBestCmap()),
+                      "before": src.stat().st_size, "after": out.stat().st_size})
+        print(f"{src.name}: {faces[-1]['before'] / 1024:,.0f} KB -> {out.name}: {faces[-1]['after'] / 1024:,.0f} KB")
+
+    rules = [
+        "@font-face {\n"
+        f"  font-family: \"{f['family']}\";\n"
+        f"  src: url(\"{f['path'].name}\") format(\"woff2\");\n"
+        f"  font-weight: {f['weight']};\n"
+        f"  font-style: {f['style']};\n"
+        "  font-display: swap;\n"
+        f"  unicode-range: {f['range']};\n"
+        "}"
+        for f in faces
+    ]
+    STYLESHEET.write_text("/* generated by `python -m core.build_fonts` */\n" + "\n".join(rules) + "\n",
+                          encoding="utf-8")
+    return faces
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    faces = build()
+    before, after = sum(f["before"] for f in faces), sum(f["after"] for f in faces)
+    print(f"wrote {STYLESHEET} ({len(faces)} faces, {before / 1024:,.0f} KB -> {after / 1024:,.0f} KB)")
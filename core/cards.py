@@ -1,11 +1,12 @@
 # core/components.py
 from typing import List
 import streamlit as st
-from core.utils import custom_container, chips, custom_write
+from core import media
+from core.utils import custom_container, chips, custom_write, center_gif
 
 
 def project_card(title: str, caption: str, tags: List[str], url: str, url_name: str, summary: str, image_url: str,
-                 image_caption: str):
+                 image_caption: str, max_width_px: int = 640):
     with custom_container(key=title, bg="#ffffff",
                           accent="#FF8C00", elevation=2, hover_elevation=4):
         left, right = st.columns([1.5, 1], vertical_alignment='center')
@@ -40,4 +41,10 @@ def project_card(title: str, caption: str, tags: List[str], url: str, url_name:
             st.write(summary)
 
         with right:
-            st.image(image_url, caption=image_caption, use_container_width=True)
+            # local GIFs with a built video rendition play as video; stills use the best-fitting WebP
+            if media.video_rendition(image_url, max_width_px):
+                center_gif(image_url, max_width_px=max_width_px, alt=image_caption)
+                st.caption(image_caption)
+            else:
+                st.image(media.rendition_path(image_url, max_width_px), caption=image_caption,
+                         use_container_width=True)
@@ -1,22 +1,310 @@
-import colorsys
+import functools
+import hashlib
+import inspect
 import json
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 import os
 import re
-from matplotlib import cm, colors as mcolors
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
 from functools import lru_cache
-import requests
-import seaborn as sns
-import plotly.express as px
 import streamlit as st
 from typing import Literal, List, Optional, Union, Sequence, Callable, Dict, Set, Any
-import geopandas as gpd
-from matplotlib.pyplot import title
-from scipy.stats import gaussian_kde
 from streamlit_echarts import st_echarts, JsCode, Map
+from core import payload
+from core.palette import colormap_hex, colors_hex, depth_palette, lighten_hex
+from core.fingerprint import fingerprint
+
+
+def _payload_size(obj) -> int:
+    """Approximate size of `obj` once serialised for the echarts component."""
+    return len(json.dumps(obj, default=lambda o: getattr(o, "js_code", None) or str(o)).encode("utf-8"))
+
+
+# significant digits of plotted coordinates (KDE curves, GIS lon/lat, GeoJSON geometry): ~1e-6 relative,
+# below a pixel. Data values shown in labels/tooltips are sent unrounded unless a chart opts in.
+OPTION_DIGITS = 6
+
+# ECharts defaults the builders spell out; keys holding them are dropped from the wire format
+_COMPONENT_DEFAULTS = {
+    "tooltip": {"show": True, "confine": False},
+}
+_SERIES_DEFAULTS = {
+    "line": {"smooth": False, "showSymbol": True},
+    "bar": {"barBorderRadius": 0},
+    "pie": {"avoidLabelOverlap": True},
+}
+
+
+def _round_significant(arr: np.ndarray, digits: int) -> np.ndarray:
+    """Floats rounded to `digits` significant digits, so each prints as at most that many digits."""
+    nonzero = np.isfinite(arr) & (arr != 0)
+    magnitude = np.floor(np.log10(np.abs(arr, out=np.ones_like(arr), where=nonzero)))
+    exp = (digits - 1 - magnitude).astype(np.int64)
+    # dividing/multiplying by an exact power of ten (up to 1e22) keeps the result the nearest double to the decimal
+    up, down = 10.0 ** np.clip(exp, 0, 22), 10.0 ** np.clip(-exp, 0, 22)
+    out = np.where(nonzero, np.round(arr * up / down) * down / up, arr)
+    extreme = nonzero & (np.abs(exp) > 22)  # tiny or huge magnitudes: rare, format them one by one
+    if extreme.any():
+        out[extreme] = [float(f"{v:.{digits}g}") for v in arr[extreme].tolist()]
+    return out
+
+
+def _compact_array(arr: np.ndarray, digits: Optional[int]) -> list:
+    if arr.dtype.kind == "f":
+        if digits is not None:
+            arr = _round_significant(arr, digits)
+        if not np.isfinite(arr).all():  # NaN/inf are not JSON
+            out = arr.astype(object)
+            out[~np.isfinite(arr)] = None
+            return out.tolist()
+    return arr.tolist()
+
+
+def _numeric_block(values: list) -> Optional[np.ndarray]:
+    """`values` as one numeric array when it is a (nested) list of plain numbers, else None."""
+    first = values[0]
+    while isinstance(first, (list, tuple)) and first:
+        first = first[0]
+    if isinstance(first, bool) or not isinstance(first, (int, float, np.number)):
+        return None
+    try:
+        arr = np.asarray(values)
+    except ValueError:  # ragged
+        return None
+    return arr if arr.dtype.kind in "iuf" else None
+
+
+def compact_option(obj, digits: Optional[int] = None, drop_defaults: bool = True, _parent: str = ""):
+    """
+    Copy of an ECharts option in its most compact JSON-ready form.
+
+    numpy arrays, scalars and (nested) lists of numbers are converted in one
+    vectorised step, with floats rounded to `digits` significant digits
+    (None keeps full precision) and NaN/inf sent as null. Keys set to None,
+    and keys set to ECharts' own default for their component or series type,
+    are dropped. The input (possibly a memoised option) is not modified.
+
+    Rounding changes the numbers labels and tooltips display (`{c}`), so only
+    pass `digits` for plotted coordinates. Significant digits are relative to
+    each value: never round data such as epoch timestamps held as floats.
+    """
+    if isinstance(obj, dict):
+        if not drop_defaults:
+            defaults = {}
+        elif _parent == "series":
+            defaults = _SERIES_DEFAULTS.get(obj.get("type"), {})
+        else:
+            defaults = _COMPONENT_DEFAULTS.get(_parent, {})
+        return {
+            k: compact_option(v, digits, drop_defaults, k)
+            for k, v in obj.items()
+            if v is not None and not (k in defaults and defaults[k] == v and type(defaults[k]) is type(v))
+        }
+    if isinstance(obj, np.ndarray):
+        return _compact_array(obj, digits)
+    if isinstance(obj, (list, tuple)):
+        if not obj:
+            return []
+        block = _numeric_block(obj) if len(obj) > 1 else None
+        if block is not None:
+            return _compact_array(block, digits)
+        return [compact_option(v, digits, drop_defaults, _parent) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float):
+        if not np.isfinite(obj):
+            return None
+        return float(f"{obj:.{digits}g}") if digits is not None else obj
+    return obj
+
+
+def option_size(obj) -> int:
+    """Bytes of `obj` serialised as JSON, as the echarts component sends it."""
+    return _payload_size(obj)
+
+
+_COMPACT_MAPS_MAX = 16
+_compact_maps: OrderedDict = OrderedDict()  # (name, GeoJSON digest, special areas, digits) -> compacted Map
+_compact_maps_lock = threading.Lock()
+_map_digests: "weakref.WeakKeyDictionary[Map, str]" = weakref.WeakKeyDictionary()
+
+
+def _map_digest(map: Map) -> str:
+    """Content hash of `map`'s GeoJSON, computed once per Map object (treat its GeoJSON as read-only)."""
+    digest = _map_digests.get(map)
+    if digest is None:
+        text = json.dumps(map.geo_json, sort_keys=True, separators=(",", ":"), default=str)
+        digest = _map_digests[map] = hashlib.sha1(text.encode()).hexdigest()
+    return digest
+
+
+def _compact_map(map: Map, digits: Optional[int]) -> Map:
+    """
+    `map` with its GeoJSON coordinates compacted, built once per map content
+    and precision. Keyed on the contents, so an equal Map rebuilt on every
+    rerun reuses the entry; a bounded LRU shared by all sessions.
+    """
+    key = (map.map_name, _map_digest(map), _freeze(map.special_areas), digits)
+    with _compact_maps_lock:
+        if key in _compact_maps:
+            _compact_maps.move_to_end(key)
+            return _compact_maps[key]
+    compacted = Map(map.map_name, compact_option(map.geo_json, digits, drop_defaults=False), map.special_areas)
+    with _compact_maps_lock:
+        _compact_maps[key] = compacted
+        while len(_compact_maps) > _COMPACT_MAPS_MAX:
+            _compact_maps.popitem(last=False)
+    return compacted
+
+
+def _st_echarts(options: dict, map: Optional[Map] = None, digits: Optional[int] = None,
+                map_digits: Optional[int] = OPTION_DIGITS, **kwargs):
+    """
+    `st_echarts` with the option (and any map GeoJSON) sent through
+    `compact_option`, and the serialised size recorded in `core.payload`.
+    `digits` rounds the option's floats (None: sent as they are), `map_digits`
+    the GeoJSON coordinates. Inside `ECharts.collect()` the option is
+    captured, already compacted, instead of rendered.
+    """
+    captured = getattr(_grid_capture, "charts", None)
+    if captured is not None:  # inside `ECharts.collect()`: keep the option for `ECharts.grid`
+        captured.append(compact_option(options, digits))
+        if map is not None:
+            captured.maps.append(map)
+        return None
+    options = compact_option(options, digits)
+    if map is not None:
+        map = _compact_map(map, map_digits)
+    payload.count(_payload_size(options) + (_payload_size(map.to_json()) if map is not None else 0), "echarts")
+    return st_echarts(options=options, map=map, **kwargs)
+
+
+def _column_list(values) -> list:
+    """A column as a JSON-ready list, straight from its numpy buffer (missing -> None)."""
+    arr = values.to_numpy() if hasattr(values, "to_numpy") else np.asarray(values)
+    if arr.dtype.kind in "fO":
+        missing = pd.isna(arr)
+        if missing.any():
+            arr = arr.astype(object)
+            arr[missing] = None
+    return arr.tolist()
+
+
+def columnar_dataset(columns: Dict[str, Any]) -> dict:
+    """
+    ECharts `dataset` holding whole columns ({dimension: [values]}).
+
+    Series point at it with `datasetIndex` and map dimensions to axes with
+    `encode` instead of carrying per-point lists. In label/tooltip templates
+    `{c}` is the whole row there; use `{@dimension}` for one value.
+    """
+    return {"source": {name: _column_list(col) for name, col in columns.items()}}
+
+
+LARGE_DATA_THRESHOLD = 2_000  # points per series from which the large-data hints switch on
+
+# ECharts' own switches for big series: `large` draws bars/points as one batched
+# path, `progressive` renders in frames so the page stays responsive, and line
+# `sampling` drops points that fall on the same pixel.
+_LARGE_DATA_HINTS = {
+    "bar": {"large": True, "largeThreshold": LARGE_DATA_THRESHOLD,
+            "progressive": 5_000, "progressiveThreshold": 10_000},
+    "scatter": {"large": True, "largeThreshold": LARGE_DATA_THRESHOLD,
+                "progressive": 20_000, "progressiveThreshold": 20_000},
+    "line": {"sampling": "lttb"},
+}
+
+
+def large_data_hints(series_type: str, n_points: int, large_data: Union[bool, dict, None] = None) -> dict:
+    """
+    Large-data series options for a `series_type` series of `n_points` points.
+
+    `large_data`: None switches them on from LARGE_DATA_THRESHOLD points,
+    True always, False never; a dict switches them on like None and
+    overrides or adds individual options.
+    """
+    if large_data is False or (large_data is not True and n_points < LARGE_DATA_THRESHOLD):
+        return {}
+    return {**_LARGE_DATA_HINTS[series_type], **(large_data if isinstance(large_data, dict) else {})}
+
+
+def _freeze(obj):
+    """Hashable stand-in for an option-builder argument."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return ("frame", fingerprint(obj))
+    if isinstance(obj, np.ndarray):
+        return ("ndarray", obj.dtype.str, obj.shape, hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest())
+    if isinstance(obj, dict):
+        return ("dict", tuple((_freeze(k), _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, tuple(_freeze(v) for v in obj))
+    if isinstance(obj, JsCode):
+        return ("JsCode", obj.js_code)
+    hash(obj)  # anything else must already be hashable
+    return obj
+
+
+def _used_columns(arguments: dict, params: Sequence[str]) -> list:
+    """Column names held by the builder parameters `params` (str or list of str)."""
+    used = []
+    for p in params:
+        v = arguments.get(p)
+        if v is None:
+            continue
+        used.extend(v if isinstance(v, (list, tuple)) else [v])
+    return used
+
+
+def _memoize_option(builder=None, *, maxsize: int = 128, frame: str = "df", columns: Sequence[str] = ()):
+    """
+    Memoise a pure `build_*_option` function on its (frozen) arguments.
+
+    The DataFrame parameter `frame` is keyed with `core.fingerprint` over just
+    the columns named by the `columns` parameters (all columns if none), so an
+    unchanged chart costs one pass over the columns it reads instead of a
+    groupby/KDE rebuild on every rerun. Bounded LRU shared by all sessions;
+    arguments that cannot be frozen just bypass the cache.
+    The returned option is shared: treat it as read-only.
+    """
+    if builder is None:
+        return functools.partial(_memoize_option, maxsize=maxsize, frame=frame, columns=columns)
+
+    signature = inspect.signature(builder)
+    entries: OrderedDict = OrderedDict()
+    lock = threading.Lock()
+    stats = {"hits": 0, "misses": 0}
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        try:
+            arguments = signature.bind(*args, **kwargs).arguments
+            data = arguments.get(frame)
+            data_key = (fingerprint(data, _used_columns(arguments, columns) or None)
+                        if isinstance(data, (pd.DataFrame, pd.Series)) else _freeze(data))
+            key = (data_key, _freeze([(k, v) for k, v in arguments.items() if k != frame]))
+        except (TypeError, KeyError):
+            # unbindable/unhashable arguments or unknown columns: let the builder report it
+            return builder(*args, **kwargs)
+        with lock:
+            if key in entries:
+                stats["hits"] += 1
+                entries.move_to_end(key)
+                return entries[key]
+            stats["misses"] += 1
+        option = builder(*args, **kwargs)
+        with lock:
+            entries[key] = option
+            while len(entries) > maxsize:
+                entries.popitem(last=False)
+        return option
+
+    wrapper.cache_info = lambda: {**stats, "entries": len(entries), "maxsize": maxsize}
+    wrapper.cache_clear = entries.clear
+    return wrapper
 
 
 @st.cache_data(show_spinner=False)
@@ -36,6 +324,7 @@ def load_geojson(source: str, source_type: str = "file") -> dict:
     if source_type == "file":
         if ext == ".shp":
             # Read shapefile and convert to GeoJSON
+            import geopandas as gpd
             try:
                 gdf = gpd.read_file(source)
             except UnicodeDecodeError:
@@ -51,6 +340,7 @@ def load_geojson(source: str, source_type: str = "file") -> dict:
             raise ValueError(f"Unsupported file type: {ext}")
     # 2) Remote URL
     elif source_type in ("url", "online"):
+        import requests
         resp = requests.get(source)
         resp.raise_for_status()
         return resp.json()
@@ -58,6 +348,48 @@ def load_geojson(source: str, source_type: str = "file") -> dict:
         raise ValueError(f"Unknown source_type '{source_type}', expected 'file' or 'url'.")
 
 
+def _coordinates(df: pd.DataFrame, lon_col: str, lat_col: str, digits: Optional[int]) -> pd.DataFrame:
+    """`df` with float lon/lat columns rounded to `digits` significant digits (other columns untouched)."""
+    if digits is None:
+        return df
+    df = df.copy(deep=False)
+    for col in (lon_col, lat_col):
+        if df[col].dtype.kind == "f":
+            df[col] = _round_significant(df[col].to_numpy(), digits)
+    return df
+
+
+@_memoize_option(columns=("lon_col", "lat_col", "value_col"))
+def _scatter_data(df: pd.DataFrame, lon_col: str, lat_col: str, value_col: Optional[str] = None,
+                  digits: Optional[int] = None) -> list:
+    """[lon, lat, value] points for `GIS.plot` scatter mode; `digits` rounds lon/lat only."""
+    df = _coordinates(df[[lon_col, lat_col] + ([value_col] if value_col else [])], lon_col, lat_col, digits)
+    return [
+        [r[lon_col], r[lat_col], r.get(value_col)]
+        for r in df.to_dict("records")
+    ]
+
+
+@_memoize_option(columns=("lon_col", "lat_col", "value_col"))
+def _scatter_dataset(df: pd.DataFrame, lon_col: str, lat_col: str, value_col: Optional[str] = None,
+                     digits: Optional[int] = None) -> dict:
+    """Columnar `dataset` (lon, lat[, value]) for `GIS.plot` scatter mode; `digits` rounds lon/lat only."""
+    df = _coordinates(df, lon_col, lat_col, digits)
+    columns = {"lon": df[lon_col], "lat": df[lat_col]}
+    if value_col:
+        columns["value"] = df[value_col]
+    return columnar_dataset(columns)
+
+
+@_memoize_option(columns=("county_col", "value_col"))
+def _choropleth_data(df: pd.DataFrame, county_col: str, value_col: str) -> list:
+    """{name, value} items for `GIS.plot` choropleth mode."""
+    return [
+        {"name": r[county_col].strip().title(), "value": r[value_col]}
+        for r in df[[county_col, value_col]].to_dict("records") if isinstance(r[county_col], str)
+    ]
+
+
 class GIS:
     """
     Lightweight helper to plot GeoJSON layers (choropleth or scatter)
@@ -119,6 +451,7 @@ class GIS:
             series = series.str.replace(r"Dublin\s*\d+[A-Za-z]*", 'Dublin', regex=True)
         return series
 
+    @payload.metered
     def plot(
             self,
             df,
@@ -129,6 +462,8 @@ class GIS:
             lon_col: Optional[str] = None,
             # scatter options
             symbol_size: int = 8,
+            dataset: bool = False,  # send the points as one columnar dataset (see `columnar_dataset`)
+            large_data: Union[bool, dict, None] = None,  # see `large_data_hints`
             # choropleth options
             visual_map: bool | dict = True,
             tooltip_title: Optional[str] = None,
@@ -148,15 +483,15 @@ class GIS:
             extra_series_opts: Optional[Dict[str, Any]] = None,
             height: Union[int, str] = "600px",
             width: Optional[Union[int, str]] = None,
+            digits: Optional[int] = OPTION_DIGITS,  # significant digits of lon/lat and GeoJSON coordinates
     ):
         def _resolve_cmap(spec, steps):
             if spec is None:
                 return None
             if isinstance(spec, (list, tuple)):
-                return [mcolors.to_hex(c) for c in spec]
+                return list(colors_hex(spec))
             if isinstance(spec, str):
-                m = cm.get_cmap(spec, steps)
-                return [mcolors.to_hex(m(i)) for i in range(m.N)]
+                return list(colormap_hex(spec, steps))
             raise TypeError("`cmap` must be a colormap name or list of colours")
 
         geo_opts = extra_geo_opts or {}
@@ -193,11 +528,16 @@ class GIS:
         ## ------------------------ Type of Plots --------------------
         # 1) Scatter mode
         if lat_col and lon_col:
-            data = [
-                [r[lon_col], r[lat_col], r.get(value_col)]
-                for r in df.to_dict("records")
-            ]
+            if dataset:
+                # one columnar dataset; the series maps its dimensions onto the geo coordinates
+                points = {"datasetIndex": 0,
+                          "encode": {"lng": "lon", "lat": "lat", **({"value": "value"} if value_col else {})}}
+                fields = "{@lon}, {@lat}" + (", {@value}" if value_col else "")
+                tooltip_opts = {**tooltip_opts, "formatter": f"{tooltip_title_html}{{b}}: {fields}"}
+            else:
+                points = {"data": _scatter_data(df, lon_col, lat_col, value_col, digits)}
             opts = {
+                **({"dataset": [_scatter_dataset(df, lon_col, lat_col, value_col, digits)]} if dataset else {}),
                 'title': title_opts,
                 "tooltip": tooltip_opts,
                 "visualMap": {'text': ['Low', "High"]},
@@ -222,11 +562,12 @@ class GIS:
                         "label": {"show": label_on_hover,
                                   "fontSize": hover_label_size or label_size},
                     },
-                    "data": data,
+                    **points,
+                    **large_data_hints("scatter", len(df), large_data),
                     **series_opts,
                 }],
             }
-            st_echarts(opts, map=self.layers[0]["map"], height=height, width=width)
+            _st_echarts(opts, map=self.layers[0]["map"], map_digits=digits, height=height, width=width)
             return
 
         # 2) Choropleth mode
@@ -243,10 +584,7 @@ class GIS:
             # import streamlit as st
             st.warning(f"Areas not found in map '{layer['map_name']}': {sorted(missing)}")
 
-        data = [
-            {"name": r[county_col].strip().title(), "value": r[value_col]}
-            for r in df.to_dict("records") if isinstance(r[county_col], str)
-        ]
+        data = _choropleth_data(df, county_col, value_col)
 
         # label configurations
         label_opts = {
@@ -322,19 +660,1405 @@ class GIS:
             opts["visualMap"] = vis
 
         # note: no 'geo' key here!
-        st_echarts(opts, map=layer["map"], height=height, width=width)
+        _st_echarts(opts, map=layer["map"], map_digits=digits, height=height, width=width)
+
+
+# high-cardinality folding shared by pie and bar (`top_n` / `min_share`)
+def _kept_labels(totals: pd.Series, top_n: Optional[int], min_share: Optional[float]) -> pd.Index:
+    """Labels of `totals` among the `top_n` largest and holding at least `min_share` of the sum."""
+    keep = np.ones(len(totals), dtype=bool)
+    if top_n is not None:
+        keep &= (totals.rank(method="first", ascending=False) <= top_n).to_numpy()
+    if min_share is not None:
+        keep &= (totals / totals.sum() >= min_share).to_numpy()
+    return totals.index[keep]
+
+
+def _top_n_other(
+        labels: pd.Series,
+        values: pd.Series,
+        top_n: Optional[int] = None,
+        min_share: Optional[float] = None,
+        other_label: str = "Other",
+) -> pd.Series:
+    """
+    `values` summed per label, keeping the largest `top_n` labels and/or those
+    with at least `min_share` (0-1) of the total, with the rest folded into one
+    `other_label` entry at the end. Vectorised; kept labels stay in order of
+    first appearance.
+    """
+    totals = values.groupby(labels, sort=False, observed=True, dropna=False).sum()
+    totals.index = totals.index.astype(object)
+    kept = _kept_labels(totals, top_n, min_share)
+    folded = totals.drop(kept).sum() if len(kept) < len(totals) else None
+    totals = totals.loc[kept]
+    if folded is not None:
+        if other_label in totals.index:
+            totals = totals.copy()
+            totals[other_label] += folded
+        else:
+            totals = pd.concat([totals, pd.Series([folded], index=[other_label])])
+    return totals
+
+
+@_memoize_option(columns=("names", "values"))
+def build_pie_option(
+        df: pd.DataFrame,
+        names: str,
+        values: str,
+        title: Optional[str] = None,
+        radius: str = "50%",
+        inner_radius: Optional[str] = None,
+        border_radius: int = 0,
+        start_angle: int = 45,
+
+        # legend placement
+        legend_orient: Literal["vertical", "horizontal"] = "vertical",
+        legend_left: str = "left",
+        legend_top: Optional[Union[str, int]] = None,
+        legend_bottom: Optional[Union[str, int]] = None,
+
+        # labeling
+        label_font_size: int = 10,
+        label_inside: bool = False,
+        label_inside_formatter: str = "{b}: {c} ({d}%)",
+        label_outside: bool = False,
+        label_outside_formatter: str = "{b}: {c} ({d}%)",
+        center_on_hover: bool = False,
+        center_label_formatter: str = "{b}\n{c}",
+        center_label_font_size: int = 18,
+        center_label_font_weight: str = "bold",
+
+        # overlap avoidance
+        avoid_label_overlap: bool = True,
+
+        # high cardinality
+        top_n: Optional[int] = None,
+        min_share: Optional[float] = None,
+        other_label: str = "Other",
+
+        # payload
+        dataset: bool = False,
+
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.pie` (see there for the arguments)."""
+    # handle donut radii
+    if inner_radius is not None:
+        radius = [inner_radius, radius] if isinstance(radius, str) else radius
+
+    labels, amounts = df[names], df[values]
+    if top_n is not None or min_share is not None:
+        # fold the small slices before any per-slice Python work
+        amounts = _top_n_other(labels, amounts, top_n, min_share, other_label)
+        labels = amounts.index.to_series()
+
+    if dataset:
+        source = columnar_dataset({"name": labels.astype(str), "value": amounts.astype(float)})
+        points = {"datasetIndex": 0, "encode": {"itemName": "name", "value": "value"}}
+        # {c} is the whole dataset row; name the value dimension instead
+        fmt = lambda template: template.replace("{c}", "{@value}")
+    else:
+        points = {"data": [{"name": str(n), "value": float(v)} for n, v in zip(labels, amounts)]}
+        fmt = lambda template: template
+
+    if label_inside:
+        lbl = {
+            "show": True,
+            "position": "inside",
+            "formatter": fmt(label_inside_formatter),
+            "fontSize": label_font_size
+        }
+        line = {"show": False}
+    elif label_outside:
+        lbl = {
+            "show": True,
+            "position": "outside",
+            "formatter": fmt(label_outside_formatter),
+            "fontSize": label_font_size
+        }
+        line = {"show": True, "length": 15, "length2": 10}
+    else:
+        lbl = {"show": False}
+        line = {"show": False}
+
+    # build legend dict
+    legend_cfg: dict = {"orient": legend_orient, "left": legend_left}
+    if legend_top is not None:    legend_cfg["top"] = legend_top
+    if legend_bottom is not None: legend_cfg["bottom"] = legend_bottom
+
+    # series config
+    series_item = {
+        "name": names,
+        "startAngle": start_angle,
+        "type": "pie",
+        "radius": radius,
+        **points,
+        "avoidLabelOverlap": avoid_label_overlap,
+        "label": lbl,
+        "labelLine": line,
+        "emphasis": {
+            "label": {
+                "show": center_on_hover,
+                "position": "center",
+                "formatter": fmt(center_label_formatter),
+                "fontSize": center_label_font_size,
+                "fontWeight": center_label_font_weight,
+            },
+            "itemStyle": {
+                "shadowBlur": 10,
+                "shadowOffsetX": 0,
+                "shadowColor": "rgba(0, 0, 0, 0.5)",
+            },
+        },
+    }
+    if border_radius:
+        series_item.setdefault("itemStyle", {})["borderRadius"] = border_radius
+
+    # assemble option
+    option = {
+        **({"title": {"text": title, "left": "center"}} if title else {}),
+        **({"dataset": [source]} if dataset else {}),
+        "tooltip": {"trigger": "item",
+                    "confine": True,
+                    "formatter": fmt("{b}: {c} ({d}%)")},
+        "legend": legend_cfg,
+        "series": [series_item],
+        **kwargs,
+    }
+    return option
+
+
+@_memoize_option(columns=("x", "y", "hue"))
+def build_bar_option(
+        df: pd.DataFrame,
+        x: str,
+        y: str,
+        hue: Optional[str] = None,
+        chart_type: Literal["stacked", "grouped"] = "grouped",
+        title: Optional[str] = None,
+        orientation: Literal["v", "h"] = "v",
+
+        # styling parameters
+        palette: Optional[Sequence[str]] = None,
+        use_gradient: bool = False,
+        gradient_colors: Sequence[str] = ("#83bff6", "#188df0"),
+        bar_max_width: Optional[Union[int, str]] = None,
+        bar_border_radius: int = 4,
+        show_labels: bool = False,
+        label_formatter: str = "{c}",
+        label_font_size: int = 12,
+        label_color: str = "#333",
+
+        axis_label_rotate: int = 0,
+        axis_label_font_size: int = 12,
+        axis_label_color: str = "#666",
+        show_grid: bool = True,
+
+        top_n: Optional[int] = None,
+        min_share: Optional[float] = None,
+        other_label: str = "Other",
+        large_data: Union[bool, dict, None] = None,
+
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.bar` (see there for the arguments)."""
+    fold = top_n is not None or min_share is not None
+    # Prepare axes
+    if orientation == "v":
+        cat_axis = {"type": "category"}
+        val_axis = {"type": "value"}
+        label_pos = "top"
+    else:
+        cat_axis = {"type": "value"}
+        val_axis = {"type": "category"}
+        label_pos = "right"
+
+    series_list = []
+    legend_items = []
+
+    # Build data series
+    if hue:
+        if fold:
+            # rank categories by their total over all hue levels; the rest share one "Other" bar
+            # a missing x is its own category, as in `_top_n_other`; rows with a missing hue are dropped
+            totals = df[y].groupby(df[x], observed=True, dropna=False).sum()
+            kept = _kept_labels(totals, top_n, min_share)
+            in_kept = df[x].isin(kept) | (df[x].isna() & kept.isna().any())  # isin won't match None to NaN
+            cats = df[x].astype(object).where(in_kept, other_label)  # kept is sorted, like groupby
+            pivot = (df[y][df[hue].notna()]
+                     .groupby([cats, df[hue]], sort=False, observed=True, dropna=False).sum()
+                     .unstack(fill_value=0))
+            # a kept `other_label` category already holds the folded rows: list it once
+            order = dict.fromkeys([*kept, other_label])
+            pivot = pivot.reindex([c for c in order if c in pivot.index])
+        else:
+            pivot = df.groupby([x, hue])[y].sum().unstack(fill_value=0)
+        cat_axis["data"] = pivot.index.astype(str).tolist()
+        for lvl in pivot.columns:
+            data = pivot[lvl].tolist()
+            item = {
+                "name": str(lvl),
+                "type": "bar",
+                "data": data,
+                "label": {
+                    "show": show_labels,
+                    "position": label_pos,
+                    "formatter": label_formatter,
+                    "fontSize": label_font_size,
+                    "color": label_color,
+                },
+                "barBorderRadius": bar_border_radius,
+                **large_data_hints("bar", len(data), large_data),
+            }
+            if chart_type == "stacked":
+                item["stack"] = "total"
+            if bar_max_width:
+                item["barMaxWidth"] = bar_max_width
+            if use_gradient:
+                item["itemStyle"] = {
+                    "color": {
+                        "type": "linear",
+                        "x": 0, "y": 0, "x2": 0, "y2": 1,
+                        "colorStops": [
+                            {"offset": 0, "color": gradient_colors[0]},
+                            {"offset": 1, "color": gradient_colors[1]},
+                        ],
+                    },
+                    "shadowBlur": 8,
+                    "shadowColor": "rgba(0, 0, 0, 0.2)",
+                }
+            series_list.append(item)
+            legend_items.append(str(lvl))
+    else:
+        cat_col, val_col = (x, y) if orientation == "v" else (y, x)
+        if fold:
+            folded = _top_n_other(df[cat_col], df[val_col], top_n, min_share, other_label)
+            categories, values = folded.index.astype(str).tolist(), folded.tolist()
+        else:
+            categories = df[cat_col].astype(str).tolist()
+            values = df[val_col].tolist()
+        cat_axis["data"] = categories
+        item = {
+            "name": y if orientation == "v" else x,
+            "type": "bar",
+            "data": values,
+            "label": {
+                "show": show_labels,
+                "position": label_pos,
+                "formatter": label_formatter,
+                "fontSize": label_font_size,
+                "color": label_color,
+            },
+            "barBorderRadius": bar_border_radius,
+            **large_data_hints("bar", len(values), large_data),
+        }
+        if bar_max_width:
+            item["barMaxWidth"] = bar_max_width
+        if use_gradient:
+            item["itemStyle"] = {
+                "color": {
+                    "type": "linear",
+                    "x": 0, "y": 0, "x2": 0, "y2": 1,
+                    "colorStops": [
+                        {"offset": 0, "color": gradient_colors[0]},
+                        {"offset": 1, "color": gradient_colors[1]},
+                    ],
+                },
+                "shadowBlur": 8,
+                "shadowColor": "rgba(0, 0, 0, 0.2)",
+            }
+        series_list = [item]
+
+    # Assemble option without any animation delay logic
+    option = {
+        **({"title": {"text": title, "left": "center"}} if title else {}),
+        **({"legend": {"data": legend_items}} if hue else {}),
+        "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+        **({"color": list(palette)} if palette else {}),
+        "grid": {"left": "10%", "right": "10%", "bottom": "15%", "containLabel": True},
+        "xAxis": {
+            **cat_axis,
+            "axisLabel": {
+                "interval": 0,
+                "rotate": axis_label_rotate,
+                "fontSize": axis_label_font_size,
+                "color": axis_label_color,
+            },
+            "axisTick": {"show": False},
+            "axisLine": {"lineStyle": {"color": "#ccc"}},
+        },
+        "yAxis": {
+            **val_axis,
+            "axisLabel": {"fontSize": axis_label_font_size, "color": axis_label_color},
+            "splitLine": {"show": show_grid, "lineStyle": {"color": "#eee"}},
+        },
+        "series": series_list,
+        **{k: v for k, v in kwargs.items() if v is not None}
+    }
+    return option
+
+
+@_memoize_option
+def build_radar_option(
+        indicators: Sequence[dict],
+        data: Sequence[Sequence[float]],
+        series_names: Optional[Sequence[str]] = None,
+        title: Optional[str] = None,
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.radar` (see there for the arguments)."""
+    series_data = []
+    for i, vals in enumerate(data):
+        name = series_names[i] if series_names else f"Series {i + 1}"
+        series_data.append({"value": vals, "name": name})
+
+    option = {
+        **({"title": {"text": title, "left": "center"}} if title else {}),
+        "tooltip": {
+            "confine": True
+        },
+        "toolbox": {'show': False},
+        "radar": {
+            "radius": 120,
+            "shape": 'circle',
+            "indicator": list(indicators),
+            "axisName": {
+                "color": '#fc6203',
+                # "backgroundColor": '#666',
+                "borderRadius": 7,
+                "padding": [5, 5],
+                "fontSize": 14
+            },
+            "axisLabel": {
+                "fontSize": 1
+            }
+
+        },
+        "series": [{
+            "type": "radar",
+            "data": series_data,
+            'itemStyle': {
+                # 'color': '#F9713C' # this will make all the trials the same color
+            },
+            "areaStyle": {
+                "opacity": 0.05
+            }
+        }
+        ],
+        **kwargs,
+    }
+    return option
+
+
+DOWNSAMPLE_MAX_POINTS = 1000  # per line series: about one point per pixel of a full-width chart
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of the line (x ascending, y finite).
+
+    Keeps the first and last point; from each of the n_out - 2 equal-count
+    buckets in between it keeps the point forming the largest triangle with
+    the point kept before it and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1])[:max(n_out, 0)]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets over points 1..n-2
+    starts, stops = edges[:-1], edges[1:]
+    # mean of each bucket (the last bucket looks ahead to the final point)
+    csx, csy = np.r_[0, np.cumsum(x)], np.r_[0, np.cumsum(y)]
+    next_start, next_stop = np.r_[starts[1:], n - 1], np.r_[stops[1:], n]
+    mean_x = (csx[next_stop] - csx[next_start]) / (next_stop - next_start)
+    mean_y = (csy[next_stop] - csy[next_start]) / (next_stop - next_start)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    prev = 0
+    for b, (lo, hi) in enumerate(zip(starts, stops)):
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[prev] - mean_x[b]) * (by - y[prev]) - (x[prev] - bx) * (mean_y[b] - y[prev]))
+        prev = lo + int(area.argmax())
+        out[b + 1] = prev
+    return out
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min-max buckets: indices of at most `n_out` points, keeping the first and
+    last point and the lowest and highest point of each equal-count bucket
+    in between, in x order. Keeps every spike; cheaper than LTTB.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n) if n_out >= n else np.array([0, n - 1])[:max(n_out, 0)]
+    n_buckets = (n_out - 2) // 2
+    inner = y[1:-1]
+    bucket = (np.arange(n - 2) * n_buckets) // (n - 2)
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    kept = [0, n - 1]
+    for extreme in (np.minimum, np.maximum):
+        hits = np.flatnonzero(inner == np.repeat(extreme.reduceat(inner, starts), np.diff(np.r_[starts, n - 2])))
+        kept.append(hits[np.r_[True, bucket[hits[1:]] != bucket[hits[:-1]]]] + 1)  # first hit per bucket
+    return np.unique(np.concatenate([np.asarray(k).ravel() for k in kept]))
+
+
+def downsample(
+        x: np.ndarray,
+        y: np.ndarray,
+        max_points: Optional[int] = DOWNSAMPLE_MAX_POINTS,
+        method: Literal["lttb", "minmax"] = "lttb",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (x, y) capped at `max_points` points for a line series, unchanged if it
+    already fits or `max_points` is None. More points than the chart has
+    pixels only add payload; "lttb" keeps the shape, "minmax" every extreme.
+    """
+    if max_points is None or len(x) <= max_points:
+        return x, y
+    if method == "lttb":
+        idx = lttb_indices(x, y, max_points)
+    elif method == "minmax":
+        idx = minmax_indices(x, y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}; expected 'lttb' or 'minmax'.")
+    return x[idx], y[idx]
+
+
+KDE_FFT_MIN_ROWS = 50_000  # engine="auto" switches to the binned FFT estimate above this many values
+_FFT_GRID_MAX = 1 << 16
+
+
+def _kde_fft(arr: np.ndarray, xs: np.ndarray, h: float) -> np.ndarray:
+    """
+    Gaussian KDE of `arr` at `xs` by linear binning + FFT convolution, O(n + m log m).
+
+    The data is binned onto a fine grid (spacing <= h/4, so the binning error
+    stays well under 1% of the peak), convolved with the kernel sampled on
+    the same spacing, then interpolated onto `xs`.
+    """
+    from scipy.signal import fftconvolve
+
+    lo, hi = min(arr.min(), xs[0]), max(arr.max(), xs[-1])
+    m = int(np.clip(np.ceil((hi - lo) / (h / 4)) + 1, 1024, _FFT_GRID_MAX))
+    grid, dx = np.linspace(lo, hi, m, retstep=True)
+
+    # linear binning: each value splits its unit weight between its two grid neighbours
+    pos = (arr - lo) / dx
+    left = np.clip(np.floor(pos).astype(np.int64), 0, m - 2)
+    frac = pos - left
+    counts = np.bincount(left, weights=1 - frac, minlength=m) + np.bincount(left + 1, weights=frac, minlength=m)
+
+    half = min(int(np.ceil(5 * h / dx)), m - 1)  # kernel support: +/- 5 bandwidths
+    u = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (u / h) ** 2) / (h * np.sqrt(2 * np.pi))
+    density = fftconvolve(counts, kernel, mode="same") / len(arr)
+    return np.interp(xs, grid, np.clip(density, 0, None))
+
+
+def kde_density(
+        arr: np.ndarray,
+        xs: np.ndarray,
+        bw_method=None,
+        engine: Literal["auto", "scipy", "fft"] = "auto",
+) -> np.ndarray:
+    """
+    Gaussian KDE of `arr` evaluated at `xs`.
+
+    `bw_method` means exactly what it does for `scipy.stats.gaussian_kde`
+    (None/"scott", "silverman", a scalar or a callable); both engines take
+    the bandwidth from it. "scipy" evaluates exactly in O(n x len(xs));
+    "fft" bins first and is O(n) (see `benchmarks.kde` for its accuracy);
+    "auto" picks "fft" from KDE_FFT_MIN_ROWS values up, unless the bandwidth
+    is too narrow for the FFT grid to resolve (extreme outliers).
+    """
+    from scipy.stats import gaussian_kde
+
+    kde = gaussian_kde(arr, bw_method=bw_method)  # O(n): only the covariance
+    h = float(np.sqrt(kde.covariance[0, 0]))
+    if engine == "auto":
+        span = max(arr.max(), xs[-1]) - min(arr.min(), xs[0])
+        resolvable = span / (h / 4) < _FFT_GRID_MAX
+        engine = "fft" if len(arr) >= KDE_FFT_MIN_ROWS and resolvable else "scipy"
+    if engine == "scipy":
+        return kde(xs)
+    if engine == "fft":
+        return _kde_fft(arr, xs, h)
+    raise ValueError(f"Unknown KDE engine {engine!r}; expected 'auto', 'scipy' or 'fft'.")
+
+
+_KDE_BATCH_CELLS = 1 << 22  # groups x FFT length transformed at once by the batched FFT pass
+
+
+def _kde_factors(counts: np.ndarray, bw_method) -> Optional[np.ndarray]:
+    """gaussian_kde's bandwidth factor for groups of `counts` values (None: not expressible per count)."""
+    if bw_method is None or bw_method == "scott":
+        return counts ** (-1 / 5)
+    if bw_method == "silverman":
+        return (counts * 3 / 4) ** (-1 / 5)
+    if np.isscalar(bw_method) and not isinstance(bw_method, str):
+        return np.full(len(counts), float(bw_method))
+    return None
+
+
+def _kde_fft_batch(values: np.ndarray, codes: np.ndarray, n: np.ndarray, h: np.ndarray,
+                   xs: np.ndarray) -> np.ndarray:
+    """
+    `_kde_fft` for many groups at once: one 2-D linear binning onto a shared
+    grid, then one FFT per block of groups with each group's Gaussian applied
+    in the frequency domain. `codes` index `n` and `h`; returns (groups, len(xs)).
+    """
+    from scipy import fft as sfft
+
+    lo, hi = min(values.min(), xs[0]), max(values.max(), xs[-1])
+    m = int(np.clip(np.ceil((hi - lo) / (h.min() / 4)) + 1, 1024, _FFT_GRID_MAX))
+    dx = (hi - lo) / (m - 1)
+    groups = len(n)
+
+    pos = (values - lo) / dx
+    left = np.clip(np.floor(pos).astype(np.int64), 0, m - 2)
+    frac = pos - left
+    flat = codes * m + left
+    counts = (np.bincount(flat, weights=1 - frac, minlength=groups * m)
+              + np.bincount(flat + 1, weights=frac, minlength=groups * m)).reshape(groups, m)
+
+    # zero padding of 6 of the widest bandwidths keeps the circular convolution from wrapping
+    size = sfft.next_fast_len(m + 2 * int(np.ceil(6 * h.max() / dx)), real=True)
+    freqs = np.fft.rfftfreq(size, d=dx)
+    p = (xs - lo) / dx
+    i0 = np.clip(np.floor(p).astype(np.int64), 0, m - 2)
+    t = p - i0
+
+    out = np.empty((groups, len(xs)))
+    step = max(_KDE_BATCH_CELLS // size, 1)
+    for a in range(0, groups, step):
+        rows = slice(a, a + step)
+        spectrum = sfft.rfft(counts[rows], n=size, axis=1)
+        spectrum *= np.exp(-2 * (np.pi * freqs[None, :] * h[rows, None]) ** 2)
+        density = sfft.irfft(spectrum, n=size, axis=1)[:, :m] / (n[rows, None] * dx)
+        out[rows] = density[:, i0] * (1 - t) + density[:, i0 + 1] * t
+    return np.clip(out, 0, None)
+
+
+def kde_groups(
+        values: np.ndarray,
+        codes: np.ndarray,
+        xs: np.ndarray,
+        bw_method=None,
+        engine: Literal["auto", "scipy", "fft"] = "auto",
+        workers: Optional[int] = None,
+) -> Dict[int, dict]:
+    """
+    Gaussian KDE and summary metrics of every group on the shared grid `xs`.
+
+    `codes[i]` is the group of `values[i]` (non-negative ints, e.g. from
+    `pd.factorize`); values must be finite. Returns code -> {"n", "mean",
+    "median", "ys"} for each group gaussian_kde can fit (two or more
+    distinct values).
+
+    Values are grouped with one integer sort; counts, means and bandwidths
+    then come from segment reductions. "fft" groups are then evaluated together by `_kde_fft_batch`, so
+    a many-level hue costs about as much as its largest group; "auto" uses it
+    once the whole column has KDE_FFT_MIN_ROWS values and stays exact below
+    that. Exact ("scipy") groups run one by one; those of KDE_FFT_MIN_ROWS
+    values or more go across `workers` processes when more than one is
+    asked for (`bw_method` must then be picklable).
+    """
+    if engine not in ("auto", "scipy", "fft"):
+        raise ValueError(f"Unknown KDE engine {engine!r}; expected 'auto', 'scipy' or 'fft'.")
+    if not len(values):
+        return {}
+    # numpy radix-sorts ints of 16 bits or less, so narrow the codes first; groups become contiguous slices
+    narrow = codes.astype(np.uint16) if codes.max() < 1 << 16 else codes
+    order = np.argsort(narrow, kind="stable")
+    values, codes = values[order], codes[order]
+    n = np.bincount(codes)
+    present = np.flatnonzero(n)
+    starts = np.r_[0, np.cumsum(n)[:-1]]
+
+    mean = np.zeros(len(n))
+    mean[present] = np.add.reduceat(values, starts[present]) / n[present]
+    median = np.zeros(len(n))
+    for g in present:
+        median[g] = np.median(values[starts[g]:starts[g] + n[g]])  # a partition, O(n) per group
+    var = np.zeros(len(n))
+    var[present] = np.add.reduceat((values - mean[codes]) ** 2, starts[present]) / np.maximum(n[present] - 1, 1)
+
+    keep = np.flatnonzero((n >= 2) & (var > 0))  # gaussian_kde cannot fit one point or a constant group
+    group = {g: values[starts[g]:starts[g] + n[g]] for g in keep}
+    factors = _kde_factors(n.astype(float), bw_method)
+    if factors is not None:
+        h = np.sqrt(var) * factors
+    else:  # callable bandwidth: let gaussian_kde work it out (O(n) per group)
+        from scipy.stats import gaussian_kde
+        h = np.zeros(len(n))
+        for g in keep:
+            h[g] = np.sqrt(gaussian_kde(group[g], bw_method=bw_method).covariance[0, 0])
+
+    span = max(values.max(), xs[-1]) - min(values.min(), xs[0])
+    fast = engine == "fft" or (engine == "auto" and len(values) >= KDE_FFT_MIN_ROWS)
+    # groups with a bandwidth too narrow for the FFT grid stay exact under "auto"
+    binned = [g for g in keep if fast and (engine == "fft" or span / (h[g] / 4) < _FFT_GRID_MAX)]
+    exact = [g for g in keep if g not in set(binned)]
+
+    ys = {}
+    if binned:
+        sel = np.isin(codes, binned)
+        remap = np.zeros(len(n), dtype=np.int64)
+        remap[binned] = np.arange(len(binned))
+        ys.update(zip(binned, _kde_fft_batch(values[sel], remap[codes[sel]], n[binned].astype(float), h[binned], xs)))
+
+    pooled = [g for g in exact if workers and workers > 1 and n[g] >= KDE_FFT_MIN_ROWS]
+    if len(pooled) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(pooled))) as pool:
+            ys.update(zip(pooled, pool.map(kde_density, [group[g] for g in pooled], [xs] * len(pooled),
+                                           [bw_method] * len(pooled), ["scipy"] * len(pooled))))
+    for g in exact:
+        if g not in ys:
+            ys[g] = kde_density(group[g], xs, bw_method=bw_method, engine="scipy")
+
+    return {int(g): {"n": int(n[g]), "mean": float(mean[g]), "median": float(median[g]), "ys": ys[g]}
+            for g in keep}
+
+
+@_memoize_option(columns=("column", "hue"))
+def build_kde_option(
+        df: pd.DataFrame,
+        column: str,
+        hue: Optional[str] = None,
+        title: Optional[str] = None,
+        title_top: str = '5%',
+        legend_top: str = '12%',
+        bandwidth: Optional[float] = None,
+        grid_size: int = 200,
+        engine: Literal["auto", "scipy", "fft"] = "auto",
+        workers: Optional[int] = None,
+        max_points: Optional[int] = DOWNSAMPLE_MAX_POINTS,
+        downsample_method: Literal["lttb", "minmax"] = "lttb",
+        dataset: bool = False,
+        large_data: Union[bool, dict, None] = None,
+        show_metrics: bool = False,
+        annotate_metrics: bool = False,
+        annotate_offset: Optional[float] = None,
+        annotate_label_offset: int = 10,
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.kde` (see there for the arguments)."""
+    # 1) Prepare the x grid
+    vals_all = df[column].dropna().astype(float).values
+    xmin, xmax = vals_all.min(), vals_all.max()
+    xs = np.linspace(xmin, xmax, grid_size)
+
+    def build_markline_data(metrics: dict, ys: np.ndarray):
+        entries = []
+        offs_x = annotate_offset if annotate_offset is not None else (xmax - xmin) * 0.01
+        for idx, m in enumerate(("mean", "median")):
+            x = metrics[m]
+            label = f"{m.capitalize()}: {x:.1f}"
+            # full vertical line
+            if show_metrics:
+                entries.append({"name": label, "xAxis": x})
+            # horizontal pointer + bold label
+            if annotate_metrics:
+                i = np.abs(xs - x).argmin()
+                y = float(ys[i])
+                y_off = annotate_label_offset * (1 if idx % 2 else -1)
+                entries.append([
+                    {"coord": [x, y]},
+                    {
+                        "coord": [x + offs_x, y],
+                        "name": label,
+                        "label": {
+                            "show": True,
+                            "formatter": "{b}",
+                            "position": "end",
+                            "offset": [0, y_off],
+                            "fontWeight": "bold"
+                        }
+                    }
+                ])
+        return entries
+
+    # 2) Evaluate every group in one batch, then build each series, baking median into the legend name
+    values = df[column].astype(float).to_numpy()
+    if hue:
+        codes, levels = pd.factorize(df[hue], sort=True)
+    else:
+        codes, levels = np.zeros(len(values), dtype=np.int64), [None]
+    valid = ~np.isnan(values) & (codes >= 0)
+    curves = kde_groups(values[valid], codes[valid], xs, bw_method=bandwidth, engine=engine, workers=workers)
+
+    series_list = []
+    legend_data = []
+    sources, shared = [], None  # dataset mode: column dicts, index of the full-grid one
+    for code, curve in curves.items():
+        ys = curve["ys"]
+        base_name = str(levels[code]) if hue else column
+        series_name = f"{base_name} (Median: {curve['median']:.1f} days)"
+
+        px, py = downsample(xs, ys, max_points, downsample_method)
+        if dataset:
+            # curves on the full grid share its x column; downsampled ones carry their own
+            if len(px) == len(xs):
+                if shared is None:
+                    shared = len(sources)
+                    sources.append({"x": xs})
+                index = shared
+            else:
+                index = len(sources)
+                sources.append({"x": px})
+            dim = f"y{len(series_list)}"
+            sources[index][dim] = py
+            points = {"datasetIndex": index, "encode": {"x": "x", "y": dim}}
+        else:
+            points = {"data": list(zip(px.tolist(), py.tolist()))}
+        cfg = {
+            "name": series_name,
+            "type": "line",
+            "smooth": True,
+            **points,
+            "showSymbol": False,
+            **large_data_hints("line", len(px), large_data),
+        }
+        # optional vertical lines & pointers
+        if show_metrics or annotate_metrics:
+            cfg["markLine"] = {
+                "symbol": ["none", "none"],
+                "lineStyle": {"type": "dashed", "opacity": 0.4},
+                "data": build_markline_data(curve, ys)
+            }
+
+        series_list.append(cfg)
+        if hue:
+            legend_data.append(series_name)
+
+    # 3) Assemble the option (once, after every series is built)
+    # Build title + legend with adjustable tops
+    title_cfg = {'text': title, 'left': 'center', 'top': title_top} if title else {}
+    legend_cfg = {'data': legend_data, 'orient': 'horizontal', 'left': 'center',
+                  'top': legend_top} if hue else {}
+
+    option = {
+        **({"title": title_cfg} if title_cfg else {}),
+        **({'legend': legend_cfg} if legend_cfg else {}),
+        **({"dataset": [columnar_dataset(src) for src in sources]} if dataset else {}),
+        "tooltip": {'show': False, "trigger": "axis", "axisPointer": {"type": "line"}},
+        "xAxis": {"type": "value", "name": column},
+        "yAxis": {"type": "value", "name": "Density"},
+        "series": series_list,
+        **kwargs
+    }
+    return option
+
+
+@_memoize_option(columns=("column",))
+def build_histogram_option(
+        df: pd.DataFrame,
+        column: str,
+        bins: int = 10,
+        density: bool = False,
+        title: Optional[str] = None,
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.histogram` (see there for the arguments)."""
+    vals = df[column].dropna().astype(float).values
+    counts, edges = np.histogram(vals, bins=bins, density=density)
+    return _histogram_option(counts, edges, column, density, title, **kwargs)
+
+
+def _histogram_option(counts: np.ndarray, edges: np.ndarray, column: str, density: bool,
+                      title: Optional[str], **kwargs) -> dict:
+    labels = [f"{edges[i]:.1f}–{edges[i + 1]:.1f}" for i in range(len(counts))]
+
+    option = {
+        **({"title": {"text": title, "left": "center"}} if title else {}),
+        "tooltip": {"trigger": "axis", "formatter": "{b}: {c}"},
+        "xAxis": {"type": "category", "data": labels, "name": column},
+        "yAxis": {"type": "value", "name": "Density" if density else "Count"},
+        "series": [{
+            "type": "bar",
+            "data": counts.tolist(),
+        }],
+        **kwargs,
+    }
+    return option
+
+
+def _chunk_values(chunk, column: str) -> np.ndarray:
+    """Non-null float values of `column` in a DataFrame / Arrow batch or table, or of a Series / array."""
+    if isinstance(chunk, pd.DataFrame):
+        vals = chunk[column]
+    elif hasattr(chunk, "schema") and hasattr(chunk, "column"):  # pyarrow RecordBatch / Table
+        vals = chunk.column(column).to_numpy(zero_copy_only=False)
+    else:
+        vals = chunk
+    vals = np.asarray(vals, dtype=float).ravel()
+    return vals[~np.isnan(vals)]
+
+
+def _chunk_passes(chunks, two_pass: bool) -> Callable[[], Any]:
+    """A factory of fresh chunk iterators; a one-shot iterator is only accepted for a single pass."""
+    if callable(chunks):
+        return chunks
+    if iter(chunks) is chunks:
+        if two_pass:  # refuse before reading anything, rather than after the min/max pass
+            raise TypeError("The chunks are a one-shot iterator but the bin edges need a min/max pass first; "
+                            "pass `range=` or explicit bin edges, or a callable that returns a fresh iterator.")
+        return lambda: chunks
+    return lambda: iter(chunks)
+
+
+def histogram_stream(
+        chunks,
+        column: str,
+        bins: Union[int, Sequence[float]] = 10,
+        range: Optional[tuple] = None,
+        density: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    `np.histogram` of `column` accumulated chunk by chunk, in constant memory.
+
+    `chunks` yields DataFrames, Arrow record batches/tables, Series or arrays,
+    e.g. ``lambda: pd.read_csv(path, usecols=[column], chunksize=1_000_000)``
+    or ``lambda: pq.ParquetFile(path).iter_batches(columns=[column])``.
+
+    With explicit edges (a sequence `bins`) or a `range`, the edges are known
+    up front and the data is read once. Otherwise a first pass finds the
+    min/max, so `chunks` must be re-iterable (a list, or a callable returning
+    a fresh iterator). Counts equal `np.histogram` on the concatenated,
+    NaN-free column: each chunk is binned against the same edges.
+    """
+    if isinstance(bins, str):
+        raise ValueError("Streaming histograms need a bin count or explicit edges, not a bin estimator.")
+    passes = _chunk_passes(chunks, two_pass=np.ndim(bins) == 0 and range is None)
+    if np.ndim(bins) == 0:
+        if range is None:
+            lo, hi = np.inf, -np.inf
+            for chunk in passes():
+                vals = _chunk_values(chunk, column)
+                if len(vals):
+                    lo, hi = min(lo, vals.min()), max(hi, vals.max())
+            range = (lo, hi) if lo <= hi else (0, 1)  # np.histogram's range for empty data
+    else:
+        range = None  # explicit edges win, as in np.histogram
+
+    counts = None
+    edges = None
+    for chunk in passes():
+        c, edges = np.histogram(_chunk_values(chunk, column), bins=bins, range=range)
+        counts = c if counts is None else counts + c
+    if counts is None:  # no chunks at all
+        counts, edges = np.histogram(np.empty(0), bins=bins, range=range)
+
+    if density:
+        db = np.array(np.diff(edges), float)
+        return counts / db / counts.sum(), edges
+    return counts, edges
+
+
+def build_histogram_stream_option(
+        chunks,
+        column: str,
+        bins: Union[int, Sequence[float]] = 10,
+        range: Optional[tuple] = None,
+        density: bool = False,
+        title: Optional[str] = None,
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.histogram_stream` (see there for the arguments)."""
+    counts, edges = histogram_stream(chunks, column, bins=bins, range=range, density=density)
+    return _histogram_option(counts, edges, column, density, title, **kwargs)
+
+
+@_memoize_option
+def build_text_stroke_option(
+        text: str,
+        font_size: int = 80,
+        font_weight: str = "bold",
+        stroke_color: str = "#000",
+        stroke_width: int = 1,
+        line_dash: Sequence[int] = (0, 200),
+        fill_color: str = "transparent",
+        duration: int = 3000,
+        loop: bool = True,
+        position: Optional[dict] = None,
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.text_stroke_animation` (see there for the arguments)."""
+    # Default to centered positioning
+    if position is None:
+        position = {"left": "center", "top": "center"}
+
+    # Create the graphic text element with stroke and dash animation
+    elem = {
+        "type": "text",
+        **position,
+        "style": {
+            "text": text,
+            "fontSize": font_size,
+            "fontWeight": font_weight,
+            "lineDash": list(line_dash),
+            "lineDashOffset": 0,
+            "fill": fill_color,
+            "stroke": stroke_color,
+            "lineWidth": stroke_width
+        },
+        "keyframeAnimation": {
+            "duration": duration,
+            "loop": loop,
+            "keyframes": [
+                {
+                    "percent": 0.7,
+                    "style": {
+                        "fill": fill_color,
+                        "lineDashOffset": line_dash[1],
+                        "lineDash": [line_dash[1], 0]
+                    }
+                },
+                {
+                    "percent": 0.8,
+                    "style": {"fill": fill_color}
+                },
+                {
+                    "percent": 1,
+                    "style": {"fill": stroke_color}
+                }
+            ]
+        }
+    }
+
+    # Assemble the option with the graphic element
+    option = {"graphic": {"elements": [elem]}, **kwargs}
+    return option
+
+
+def _hierarchy_levels(df: pd.DataFrame, path: Sequence[str], values: str) -> list[dict]:
+    """
+    Aggregate `values` over every prefix of `path`, one factorisation per level.
+
+    Returns, per depth, the node names, each node's parent (index into the
+    previous depth) and its summed value. Nodes are numbered in order of
+    first appearance, which is the insertion order of the old nested-dict
+    walk. Missing keys become "<NA>". `np.bincount` adds the weights
+    sequentially in row order, so sums match a Python loop bit for bit.
+    """
+    weights = df[values].to_numpy(dtype=float)
+    levels, parent_codes = [], None
+    for col in path:
+        keys = df[col]
+        keys = keys.astype(object).where(keys.notna(), "<NA>")
+        key_codes, key_uniques = pd.factorize(keys, sort=False)
+        if parent_codes is None:
+            codes, n = key_codes, len(key_uniques)
+        else:
+            # a node is (parent, key); renumber the pairs by first appearance
+            combined = parent_codes.astype(np.int64) * len(key_uniques) + key_codes
+            codes, combined_uniques = pd.factorize(combined, sort=False)
+            n = len(combined_uniques)
+        first = np.empty(n, dtype=np.int64)
+        first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)  # first row of each node
+        levels.append({
+            "names": np.asarray(keys.to_numpy(dtype=object))[first].tolist(),
+            "parents": None if parent_codes is None else parent_codes[first],
+            "values": np.bincount(codes, weights=weights, minlength=n).tolist(),
+        })
+        parent_codes = codes
+    return levels
+
+
+def _sunburst_nodes(df: pd.DataFrame, path: Sequence[str], values: str, base_color: str) -> list:
+    """Nested sunburst `data` built bottom-up from the aggregated levels."""
+    levels = _hierarchy_levels(df, path, values)
+    palette = depth_palette(base_color, len(path))  # one lighter variant per depth, memoised
+    children = None  # per node of the level below: list of child items
+    for depth in range(len(levels) - 1, -1, -1):
+        level = levels[depth]
+        color = palette[depth]
+        items = []
+        for i, (name, value) in enumerate(zip(level["names"], level["values"])):
+            item = {
+                "name": name,
+                "value": value,
+                "itemStyle": {"color": color},
+                "label": {
+                    "formatter": "{b}: {c}",
+                    "rotate": "radial"
+                }
+            }
+            if children is not None and children[i]:
+                item["children"] = children[i]
+            items.append(item)
+        if depth == 0:
+            return items
+        # hand each item to its parent, keeping first-appearance order
+        children = [[] for _ in range(len(levels[depth - 1]["names"]))]
+        for item, parent in zip(items, level["parents"].tolist()):
+            children[parent].append(item)
+    return []
+
+
+@_memoize_option(columns=("path", "values"))
+def build_sunburst_option(
+        df: pd.DataFrame,
+        path: list[str],
+        values: str,
+        title: str = "Sunburst Monochrome",
+        radius: list[str] | None = None,
+        center: list[str] | None = None,
+        base_color: str = "#5470C6",
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.sunburst` (see there for the arguments)."""
+    # defaults
+    radius = radius or ["20%", "75%"]
+    center = center or ["50%", "50%"]
+
+    data = _sunburst_nodes(df, path, values, base_color)
+
+    option = {
+        "title": {"text": title, "left": "center"},
+        "series": [{
+            "type": "sunburst",
+            "radius": radius,
+            "center": center,
+            "data": data,
+            "label": {"rotate": "radial"}
+        }],
+        **kwargs
+    }
+    return option
+
+
+def _sankey_pair(
+        df: pd.DataFrame,
+        src_col: str,
+        tgt_col: str,
+        value: str,
+        min_flow: Optional[float] = None,
+        top_k_per_source: Optional[int] = None,
+        other_label: str = "Other",
+) -> pd.DataFrame:
+    """
+    Summed flows from `src_col` to `tgt_col` as a (source, target, value) frame.
+
+    Flows below `min_flow`, or outside a source's `top_k_per_source` largest,
+    are folded into one "<other_label> (<tgt_col>)" target per source. The
+    label names the stage so Other nodes of different stages never link into
+    a cycle.
+    """
+    grouped = df.groupby([src_col, tgt_col], observed=True)[value].sum().reset_index()
+    table = pd.DataFrame({
+        "source": grouped[src_col].astype(str),
+        "target": grouped[tgt_col].astype(str),
+        "value": grouped[value].astype(float),
+    })
+    if min_flow is None and top_k_per_source is None:
+        return table
+
+    keep = np.ones(len(table), dtype=bool)
+    if min_flow is not None:
+        keep &= (table["value"] >= min_flow).to_numpy()
+    if top_k_per_source is not None:
+        rank = table.groupby("source", sort=False)["value"].rank(method="first", ascending=False)
+        keep &= (rank <= top_k_per_source).to_numpy()
+    if keep.all():
+        return table
+    other = table.loc[~keep].groupby("source", as_index=False, sort=False)["value"].sum()
+    other.insert(1, "target", f"{other_label} ({tgt_col})")
+    return pd.concat([table.loc[keep], other], ignore_index=True)
+
+
+@_memoize_option(columns=("levels", "value"))
+def build_sankey_option(
+        df: pd.DataFrame,
+        levels: Sequence[str],
+        value: str,
+        node_width: Union[int, str] = 20,
+        node_gap: int = 8,
+        layout: Literal["none", "orthogonal"] = "none",
+        orient: Literal["horizontal", "vertical"] = "horizontal",
+        emphasis: Optional[dict] = None,
+        min_flow: Optional[float] = None,
+        top_k_per_source: Optional[int] = None,
+        other_label: str = "Other",
+        **kwargs
+) -> dict:
+    """Option dict for `ECharts.sankey_multi` (see there for the arguments)."""
+    # 1) aggregate each adjacent pair of levels, pruning small flows
+    tables = [
+        _sankey_pair(df, src_col, tgt_col, value, min_flow, top_k_per_source, other_label)
+        for src_col, tgt_col in zip(levels, levels[1:])
+    ]
+    links = [
+        {"source": src, "target": tgt, "value": v}
+        for t in tables
+        for src, tgt, v in zip(t["source"].tolist(), t["target"].tolist(), t["value"].tolist())
+    ]
+
+    # 2) nodes: every name used by a link, stage by stage
+    if tables:
+        names = pd.unique(np.concatenate([t[c].to_numpy(dtype=object) for t in tables for c in ("source", "target")]))
+    else:
+        names = pd.unique(df[levels[0]].dropna().astype(str).to_numpy(dtype=object)) if levels else []
+    nodes = [{"name": n} for n in names]
 
+    # 3) assemble the full ECharts option
+    option = {
+        "tooltip": {"trigger": "item", "triggerOn": "mousemove"},
+        "series": [{
+            "type": "sankey",
+            "layout": layout,
+            "orient": orient,
+            "data": nodes,
+            "links": links,
+            "nodeWidth": node_width,
+            "nodeGap": node_gap,
+            **({"emphasis": emphasis} if emphasis is not None else {})
+        }],
+        **kwargs,
+    }
+    return option
 
-# helper to lighten a hex color by fraction (0→full light)
-def lighten_hex(hex_color: str, fraction: float) -> str:
-    """Return a lighter hex string by interpolating toward white."""
-    hex_color = hex_color.lstrip('#')
-    r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
-    # convert to HLS, bump lightness
-    h, l, s = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
-    l = min(1, l + fraction * (1 - l))
-    nr, ng, nb = colorsys.hls_to_rgb(h, l, s)
-    return f"#{int(nr * 255):02x}{int(ng * 255):02x}{int(nb * 255):02x}"
+
+# ————————————————————————————————————————————————————————
+# Chart grid: several options in one echarts instance
+# ————————————————————————————————————————————————————————
+_UNSUPPORTED_IN_GRID = ("polar", "angleAxis", "radiusAxis", "parallel", "parallelAxis", "singleAxis",
+                        "calendar", "timeline", "baseOption", "options")
+_CARTESIAN_SERIES = ("line", "bar", "scatter", "effectScatter", "candlestick", "boxplot", "heatmap",
+                     "pictorialBar", "custom")
+_CENTRED_SERIES = {"pie": ("50%", "75%"), "sunburst": ("50%", "75%"), "gauge": ("50%", "75%")}
+_BOX_SERIES = ("sankey", "treemap", "funnel", "graph", "tree", "themeRiver", "map")
+_ITEM_LEGEND_SERIES = ("pie", "funnel", "sunburst")  # legends list data items rather than series
+
+_grid_capture = threading.local()
+
+
+class CapturedCharts(list):
+    """Options captured by `ECharts.collect()`, in call order, with any GeoJSON maps they need."""
+
+    def __init__(self):
+        super().__init__()
+        self.maps: List[Map] = []
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _pct(value: float) -> str:
+    return f"{round(value, 2):g}%"
+
+
+def _fraction(value, default: float, px: Optional[float] = None) -> tuple[float, str]:
+    """
+    (fraction, anchor) of a left/top style position within its container:
+    "center" -> (0.5, "center"), "right" -> (1, "far"), "12%" -> (0.12, "near").
+    Pixels scale by `px` (the container size) when known, else fall back to `default`.
+    """
+    if isinstance(value, str):
+        if value in ("left", "top"):
+            return 0.0, "near"
+        if value in ("center", "middle"):
+            return 0.5, "center"
+        if value in ("right", "bottom"):
+            return 1.0, "far"
+        if value.endswith("%"):
+            return float(value[:-1]) / 100, "near"
+        if value.endswith("px"):
+            value = float(value[:-2])
+    if isinstance(value, (int, float)) and px:
+        return value / px, "near"
+    return default, "near"
+
+
+def _place(cfg: dict, cell: tuple, px_height: float, *, title: bool = False) -> dict:
+    """A title/legend/visualMap/graphic config positioned inside `cell` instead of the whole chart."""
+    x, y, w, h = cell
+    out = {k: v for k, v in cfg.items() if k not in ("left", "right", "top", "bottom")}
+    for near, far, start, size, px in (("left", "right", x, w, None), ("top", "bottom", y, h, px_height)):
+        if cfg.get(near) is None and cfg.get(far) is not None:
+            f, _ = _fraction(cfg[far], 0.0, px)
+            out[far] = _pct(100 - (start + size) + f * size)
+            continue
+        f, anchor = _fraction(cfg.get(near), 0.5 if title and near == "left" else 0.0, px)
+        if anchor == "far":
+            out[far] = _pct(100 - (start + size))
+        elif anchor == "center" and title and near == "left":
+            out[near] = _pct(start + f * size)
+            out["textAlign"] = "center"
+        elif anchor == "center":
+            # ECharts centres components in the whole chart only, and a legend's width is not
+            # known here: start it at the cell's edge rather than let it run into the next cell
+            out[near] = _pct(start)
+        else:
+            out[near] = _pct(start + f * size)
+    return out
+
+
+def _inset(cfg: dict, cell: tuple, px_height: float, default: tuple = (0.1, 0.1, 0.15, 0.15)) -> dict:
+    """Box (grid, geo, sankey, ...) left/right/top/bottom insets kept proportional inside `cell`."""
+    x, y, w, h = cell
+    out = {k: v for k, v in cfg.items() if k not in ("left", "right", "top", "bottom", "width", "height")}
+    d_left, d_right, d_top, d_bottom = default
+
+    def inset(value, d, px=None):  # "center"/"right" keywords keep the default, symmetric inset
+        f, anchor = _fraction(value, d, px)
+        return f if anchor == "near" else d
+
+    out["left"] = _pct(x + inset(cfg.get("left"), d_left) * w)
+    out["right"] = _pct(100 - (x + w) + inset(cfg.get("right"), d_right) * w)
+    out["top"] = _pct(y + inset(cfg.get("top"), d_top, px_height) * h)
+    out["bottom"] = _pct(100 - (y + h) + inset(cfg.get("bottom"), d_bottom, px_height) * h)
+    return out
+
+
+def _centre(cfg: dict, cell: tuple, px_height: float, default_radius) -> dict:
+    """`center`/`radius` of a radar or pie-like series moved and scaled into `cell`."""
+    x, y, w, h = cell
+    cx, cy = _as_list(cfg.get("center")) or ["50%", "50%"]
+    out = dict(cfg)
+    out["center"] = [_pct(x + _fraction(cx, 0.5)[0] * w), _pct(y + _fraction(cy, 0.5)[0] * h)]
+
+    def scale(r):  # % of half the smaller side -> pixels of the cell, taking its height as that side
+        return round(_fraction(r, 0.75)[0] * px_height / 2, 1) if isinstance(r, str) and r.endswith("%") else r
+
+    radius = cfg.get("radius", default_radius)
+    out["radius"] = [scale(r) for r in radius] if isinstance(radius, (list, tuple)) else scale(radius)
+    return out
+
+
+def _legend_names(series: list, datasets: list) -> list:
+    names = []
+    for s in series:
+        if s.get("type") not in _ITEM_LEGEND_SERIES:
+            if s.get("name") is not None:
+                names.append(s["name"])
+        elif isinstance(s.get("data"), list):
+            names += [d["name"] for d in s["data"] if isinstance(d, dict) and "name" in d]
+        elif "encode" in s and datasets:
+            source = datasets[s.get("datasetIndex", 0)].get("source", {})
+            names += list(source.get(s["encode"].get("itemName"), []))
+    return names
+
+
+def merge_options(options: Sequence[dict], columns: int = 2, row_height: int = 400, gap: float = 2.0) -> dict:
+    """
+    One ECharts option drawing each of `options` in its own cell of a grid.
+
+    Cells are filled row by row, `columns` per row, each `row_height` px tall,
+    with `gap` % between them. Per chart, the cartesian grid/axes, radar,
+    geo, datasets, visualMaps and dataZooms become entries of the merged
+    lists with every series' index references shifted to match; titles,
+    legends and graphics are positioned inside the cell and pie-like series
+    are re-centred and scaled to it. Legends only list their own chart's
+    series. Each chart keeps its tooltip: cartesian charts through their
+    grid, others through their series. For other root keys (animation,
+    backgroundColor, ...) the first chart that sets one wins; a `color`
+    palette is applied to its own chart's series.
+
+    The inputs are not modified (they may be memoised options).
+    """
+    options = list(options)
+    if not options:
+        raise ValueError("merge_options needs at least one option.")
+    rows = -(-len(options) // columns)
+    width = (100 - gap * (columns + 1)) / columns
+    height = (100 - gap * (rows + 1)) / rows
+    px_height = rows * row_height * height / 100
+
+    merged = {k: [] for k in ("title", "legend", "grid", "xAxis", "yAxis", "radar", "geo", "dataset",
+                              "visualMap", "dataZoom", "graphic", "series")}
+    root: dict = {}
+    any_tooltip = False
+    for i, option in enumerate(options):
+        unsupported = sorted(set(option) & set(_UNSUPPORTED_IN_GRID))
+        if unsupported:
+            raise ValueError(f"Chart {i} uses {unsupported}, which a chart grid does not support.")
+        cell = (gap + (i % columns) * (width + gap), gap + (i // columns) * (height + gap), width, height)
+        offset = {k: len(merged[k]) for k in merged}
+        series = [dict(s) for s in _as_list(option.get("series"))]
+        datasets = _as_list(option.get("dataset"))
+        tooltip = option.get("tooltip")
+        any_tooltip |= tooltip is not None
+
+        for t in _as_list(option.get("title")):
+            merged["title"].append(_place(t, cell, px_height, title=True))
+
+        cartesian = "xAxis" in option or "yAxis" in option
+        if cartesian:
+            for g in _as_list(option.get("grid")) or [{}]:
+                merged["grid"].append({**_inset(g, cell, px_height), **({"tooltip": tooltip} if tooltip else {})})
+            for key in ("xAxis", "yAxis"):
+                for axis in _as_list(option.get(key)) or [{}]:
+                    merged[key].append({**axis, "gridIndex": axis.get("gridIndex", 0) + offset["grid"]})
+        for r in _as_list(option.get("radar")):
+            merged["radar"].append(_centre(r, cell, px_height, "75%"))
+        for g in _as_list(option.get("geo")):
+            merged["geo"].append(_inset(g, cell, px_height, (0.05, 0.05, 0.1, 0.05)))
+        merged["dataset"] += datasets
+
+        for s in series:
+            kind = s.get("type")
+            if cartesian and kind in _CARTESIAN_SERIES and s.get("coordinateSystem", "cartesian2d") == "cartesian2d":
+                s["xAxisIndex"] = s.get("xAxisIndex", 0) + offset["xAxis"]
+                s["yAxisIndex"] = s.get("yAxisIndex", 0) + offset["yAxis"]
+            if kind == "radar":
+                s["radarIndex"] = s.get("radarIndex", 0) + offset["radar"]
+            if s.get("coordinateSystem") == "geo" or (kind == "map" and "geoIndex" in s):
+                s["geoIndex"] = s.get("geoIndex", 0) + offset["geo"]
+            elif kind in _BOX_SERIES:
+                s.update(_inset(s, cell, px_height, (0.05, 0.2 if kind == "sankey" else 0.05, 0.1, 0.05)))
+            if kind in _CENTRED_SERIES:
+                s.update(_centre(s, cell, px_height, _CENTRED_SERIES[kind][1]))
+            if datasets and ("encode" in s or "datasetIndex" in s):
+                s["datasetIndex"] = s.get("datasetIndex", 0) + offset["dataset"]
+            if tooltip and not cartesian:
+                s["tooltip"] = {**{k: v for k, v in tooltip.items() if k not in ("trigger", "axisPointer")},
+                                **s.get("tooltip", {})}
+
+        palette = option.get("color")
+        if palette:
+            for j, s in enumerate(series):
+                if s.get("type") in _ITEM_LEGEND_SERIES and isinstance(s.get("data"), list):
+                    s["data"] = [{**d, "itemStyle": {"color": palette[k % len(palette)], **d.get("itemStyle", {})}}
+                                 if isinstance(d, dict) else d for k, d in enumerate(s["data"])]
+                else:
+                    s["itemStyle"] = {"color": palette[j % len(palette)], **s.get("itemStyle", {})}
+
+        own = list(range(offset["series"], offset["series"] + len(series)))
+        for vm in _as_list(option.get("visualMap")):
+            targets = _as_list(vm.get("seriesIndex")) or range(len(series))
+            merged["visualMap"].append({**_place(vm, cell, px_height), "seriesIndex": [own[k] for k in targets]})
+        for dz in _as_list(option.get("dataZoom")):
+            dz = dict(dz)
+            if "yAxisIndex" in dz:
+                dz["yAxisIndex"] = [k + offset["yAxis"] for k in _as_list(dz["yAxisIndex"])]
+            else:
+                dz["xAxisIndex"] = [k + offset["xAxis"] for k in (_as_list(dz.get("xAxisIndex")) or [0])]
+            merged["dataZoom"].append(dz)
+        graphic = option.get("graphic")
+        elements = graphic.get("elements", []) if isinstance(graphic, dict) else _as_list(graphic)
+        merged["graphic"] += [_place(e, cell, px_height) for e in elements]
+        for lg in _as_list(option.get("legend")):
+            lg = {**lg, "data": lg.get("data", _legend_names(series, datasets))}
+            merged["legend"].append(_place(lg, cell, px_height))
+
+        merged["series"] += series
+        for k, v in option.items():
+            if k not in merged and k not in ("tooltip", "color"):
+                root.setdefault(k, v)
+
+    return {
+        **root,
+        **({"tooltip": {"trigger": "item"}} if any_tooltip else {}),
+        **{k: v for k, v in merged.items() if v},
+    }
 
 
 class ECharts:
@@ -346,6 +2070,7 @@ class ECharts:
       - Radar (multi-axis comparisons)
       - KDE (smoothed density estimate for continuous variables like LOS)
       - Histogram (count or density)
+      - Grid (several of the above in one ECharts instance)
     """
 
     @classmethod
@@ -353,6 +2078,62 @@ class ECharts:
         cls.gis = GIS(**gis_kwargs)
 
     @staticmethod
+    @contextmanager
+    def collect():
+        """
+        Capture the charts drawn inside the block (any `ECharts.*` or
+        `GIS.plot` call) instead of rendering them, for `ECharts.grid`:
+
+            with ECharts.collect() as charts:
+                ECharts.radar(...)
+                ECharts.pie(...)
+            ECharts.grid(charts, columns=2)
+        """
+        charts = CapturedCharts()
+        previous = getattr(_grid_capture, "charts", None)
+        _grid_capture.charts = charts
+        try:
+            yield charts
+        finally:
+            _grid_capture.charts = previous
+
+    @staticmethod
+    @payload.metered
+    def grid(
+            charts: Sequence[dict],
+            columns: int = 2,
+            row_height: int = 400,
+            gap: float = 2.0,
+            digits: Optional[int] = None,
+            key: Optional[str] = None,
+    ) -> None:
+        """
+        Renders several charts in a single ECharts instance (one component
+        iframe and one copy of the ECharts bundle instead of one per chart).
+
+        Args:
+          charts: Option dicts (e.g. from the `build_*_option` functions) or the
+                  result of `ECharts.collect()`.
+          columns: Charts per row; rows are added as needed.
+          row_height: Height of each row in px.
+          gap: Space between cells, in % of the whole chart.
+          digits: Round the merged option's numbers to this many significant digits
+                  (see `compact_option`); None sends each chart as it was captured.
+          key: Streamlit component key.
+
+        See `merge_options` for how each chart is fitted into its cell. Charts
+        that need a GeoJSON map must all use the same one.
+        """
+        maps = list({id(m): m for m in getattr(charts, "maps", [])}.values())
+        if len(maps) > 1:
+            raise ValueError("Charts in one grid can share a single GeoJSON map only.")
+        option = merge_options(charts, columns=columns, row_height=row_height, gap=gap)
+        rows = -(-len(charts) // columns)
+        _st_echarts(option, map=maps[0] if maps else None, digits=digits,
+                    height=f"{rows * row_height}px", key=key)
+
+    @staticmethod
+    @payload.metered
     def pie(
             df: pd.DataFrame,
             names: str,
@@ -384,6 +2165,15 @@ class ECharts:
             # overlap avoidance
             avoid_label_overlap: bool = True,
 
+            # high cardinality
+            top_n: Optional[int] = None,
+            min_share: Optional[float] = None,
+            other_label: str = "Other",
+
+            # payload
+            dataset: bool = False,
+            digits: Optional[int] = None,
+
             **kwargs
     ) -> None:
         """
@@ -418,6 +2208,17 @@ class ECharts:
         Overlap avoidance:
           avoid_label_overlap: let ECharts try to prevent label collisions.
 
+        High cardinality (either option sums the values per name first):
+          top_n: Keep the N largest slices and fold the rest into one `other_label` slice.
+          min_share: Fold slices under this share (0-1) of the total into `other_label`.
+          other_label: Name of the folded slice.
+
+        Payload:
+          dataset: Send names/values as one columnar ECharts `dataset` instead of
+                   per-slice dicts; `{c}` in the formatters is mapped to the value.
+          digits: Round the numbers sent to this many significant digits (see `compact_option`);
+                  None (default) sends them exactly as labels and tooltips should show them.
+
         **kwargs** are merged into the root ECharts `option`.
 
         Examples of nudging the legend to the bottom to clear outside labels:
@@ -446,79 +2247,23 @@ class ECharts:
                 avoid_label_overlap=True
             )
         """
-        # handle donut radii
-        if inner_radius is not None:
-            radius = [inner_radius, radius] if isinstance(radius, str) else radius
-
-        data = [{"name": str(n), "value": float(v)} for n, v in zip(df[names], df[values])]
-
-        if label_inside:
-            lbl = {
-                "show": True,
-                "position": "inside",
-                "formatter": label_inside_formatter,
-                "fontSize": label_font_size
-            }
-            line = {"show": False}
-        elif label_outside:
-            lbl = {
-                "show": True,
-                "position": "outside",
-                "formatter": label_outside_formatter,
-                "fontSize": label_font_size
-            }
-            line = {"show": True, "length": 15, "length2": 10}
-        else:
-            lbl = {"show": False}
-            line = {"show": False}
-
-        # build legend dict
-        legend_cfg: dict = {"orient": legend_orient, "left": legend_left}
-        if legend_top is not None:    legend_cfg["top"] = legend_top
-        if legend_bottom is not None: legend_cfg["bottom"] = legend_bottom
-
-        # series config
-        series_item = {
-            "name": names,
-            "startAngle": start_angle,
-            "type": "pie",
-            "radius": radius,
-            "data": data,
-            "avoidLabelOverlap": avoid_label_overlap,
-            "label": lbl,
-            "labelLine": line,
-            "emphasis": {
-                "label": {
-                    "show": center_on_hover,
-                    "position": "center",
-                    "formatter": center_label_formatter,
-                    "fontSize": center_label_font_size,
-                    "fontWeight": center_label_font_weight,
-                },
-                "itemStyle": {
-                    "shadowBlur": 10,
-                    "shadowOffsetX": 0,
-                    "shadowColor": "rgba(0, 0, 0, 0.5)",
-                },
-            },
-        }
-        if border_radius:
-            series_item.setdefault("itemStyle", {})["borderRadius"] = border_radius
-
-        # assemble option
-        option = {
-            **({"title": {"text": title, "left": "center"}} if title else {}),
-            "tooltip": {"trigger": "item",
-                        "confine": True,
-                        "formatter": "{b}: {c} ({d}%)"},
-            "legend": legend_cfg,
-            "series": [series_item],
-            **kwargs,
-        }
-
-        st_echarts(options=option, height=height)
+        option = build_pie_option(df=df, names=names, values=values, title=title, radius=radius,
+                                  inner_radius=inner_radius, border_radius=border_radius,
+                                  start_angle=start_angle, legend_orient=legend_orient, legend_left=legend_left,
+                                  legend_top=legend_top, legend_bottom=legend_bottom,
+                                  label_font_size=label_font_size, label_inside=label_inside,
+                                  label_inside_formatter=label_inside_formatter, label_outside=label_outside,
+                                  label_outside_formatter=label_outside_formatter,
+                                  center_on_hover=center_on_hover,
+                                  center_label_formatter=center_label_formatter,
+                                  center_label_font_size=center_label_font_size,
+                                  center_label_font_weight=center_label_font_weight,
+                                  avoid_label_overlap=avoid_label_overlap, top_n=top_n, min_share=min_share,
+                                  other_label=other_label, dataset=dataset, **kwargs)
+        _st_echarts(option, digits=digits, height=height)
 
     @staticmethod
+    @payload.metered
     def bar(
             df: pd.DataFrame,
             x: str,
@@ -545,6 +2290,12 @@ class ECharts:
             axis_label_color: str = "#666",
             show_grid: bool = True,
 
+            top_n: Optional[int] = None,
+            min_share: Optional[float] = None,
+            other_label: str = "Other",
+            large_data: Union[bool, dict, None] = None,
+            digits: Optional[int] = None,
+
             **kwargs
     ) -> None:
         """
@@ -575,129 +2326,39 @@ class ECharts:
           axis_label_color: Color for axis labels.
           show_grid: Whether to show horizontal grid lines.
 
+          top_n: Keep the N categories with the largest total (over all hue levels) and
+                 sum the rest into one `other_label` bar. Rows are summed per category;
+                 a missing category is ranked and shown as its own ("nan") bar.
+          min_share: Likewise fold categories under this share (0-1) of the total.
+          other_label: Category name of the folded bar.
+          large_data: ECharts large/progressive hints per series; None switches them on
+                      from LARGE_DATA_THRESHOLD bars, True/False forces, a dict overrides
+                      (see `large_data_hints`).
+          digits: Round the numbers sent to this many significant digits (see `compact_option`);
+                  None (default) sends them exactly as labels and tooltips should show them.
+
           **kwargs: Any additional ECharts options to merge in.
         """
-        # Prepare axes
-        if orientation == "v":
-            cat_axis = {"type": "category"}
-            val_axis = {"type": "value"}
-            label_pos = "top"
-        else:
-            cat_axis = {"type": "value"}
-            val_axis = {"type": "category"}
-            label_pos = "right"
-
-        series_list = []
-        legend_items = []
-
-        # Build data series
-        if hue:
-            pivot = df.groupby([x, hue])[y].sum().unstack(fill_value=0)
-            cat_axis["data"] = pivot.index.astype(str).tolist()
-            for lvl in pivot.columns:
-                data = pivot[lvl].tolist()
-                item = {
-                    "name": str(lvl),
-                    "type": "bar",
-                    "data": data,
-                    "label": {
-                        "show": show_labels,
-                        "position": label_pos,
-                        "formatter": label_formatter,
-                        "fontSize": label_font_size,
-                        "color": label_color,
-                    },
-                    "barBorderRadius": bar_border_radius,
-                }
-                if chart_type == "stacked":
-                    item["stack"] = "total"
-                if bar_max_width:
-                    item["barMaxWidth"] = bar_max_width
-                if use_gradient:
-                    item["itemStyle"] = {
-                        "color": {
-                            "type": "linear",
-                            "x": 0, "y": 0, "x2": 0, "y2": 1,
-                            "colorStops": [
-                                {"offset": 0, "color": gradient_colors[0]},
-                                {"offset": 1, "color": gradient_colors[1]},
-                            ],
-                        },
-                        "shadowBlur": 8,
-                        "shadowColor": "rgba(0, 0, 0, 0.2)",
-                    }
-                series_list.append(item)
-                legend_items.append(str(lvl))
-        else:
-            categories = df[x].astype(str).tolist() if orientation == "v" else df[y].astype(str).tolist()
-            values = df[y].tolist() if orientation == "v" else df[x].tolist()
-            cat_axis["data"] = categories
-            item = {
-                "name": y if orientation == "v" else x,
-                "type": "bar",
-                "data": values,
-                "label": {
-                    "show": show_labels,
-                    "position": label_pos,
-                    "formatter": label_formatter,
-                    "fontSize": label_font_size,
-                    "color": label_color,
-                },
-                "barBorderRadius": bar_border_radius,
-            }
-            if bar_max_width:
-                item["barMaxWidth"] = bar_max_width
-            if use_gradient:
-                item["itemStyle"] = {
-                    "color": {
-                        "type": "linear",
-                        "x": 0, "y": 0, "x2": 0, "y2": 1,
-                        "colorStops": [
-                            {"offset": 0, "color": gradient_colors[0]},
-                            {"offset": 1, "color": gradient_colors[1]},
-                        ],
-                    },
-                    "shadowBlur": 8,
-                    "shadowColor": "rgba(0, 0, 0, 0.2)",
-                }
-            series_list = [item]
-
-        # Assemble option without any animation delay logic
-        option = {
-            **({"title": {"text": title, "left": "center"}} if title else {}),
-            **({"legend": {"data": legend_items}} if hue else {}),
-            "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
-            **({"color": list(palette)} if palette else {}),
-            "grid": {"left": "10%", "right": "10%", "bottom": "15%", "containLabel": True},
-            "xAxis": {
-                **cat_axis,
-                "axisLabel": {
-                    "interval": 0,
-                    "rotate": axis_label_rotate,
-                    "fontSize": axis_label_font_size,
-                    "color": axis_label_color,
-                },
-                "axisTick": {"show": False},
-                "axisLine": {"lineStyle": {"color": "#ccc"}},
-            },
-            "yAxis": {
-                **val_axis,
-                "axisLabel": {"fontSize": axis_label_font_size, "color": axis_label_color},
-                "splitLine": {"show": show_grid, "lineStyle": {"color": "#eee"}},
-            },
-            "series": series_list,
-            **{k: v for k, v in kwargs.items() if v is not None}
-        }
-
-        st_echarts(options=option, height=height)
+        option = build_bar_option(df=df, x=x, y=y, hue=hue, chart_type=chart_type, title=title,
+                                  orientation=orientation, palette=palette, use_gradient=use_gradient,
+                                  gradient_colors=gradient_colors, bar_max_width=bar_max_width,
+                                  bar_border_radius=bar_border_radius, show_labels=show_labels,
+                                  label_formatter=label_formatter, label_font_size=label_font_size,
+                                  label_color=label_color, axis_label_rotate=axis_label_rotate,
+                                  axis_label_font_size=axis_label_font_size, axis_label_color=axis_label_color,
+                                  show_grid=show_grid, top_n=top_n, min_share=min_share,
+                                  other_label=other_label, large_data=large_data, **kwargs)
+        _st_echarts(option, digits=digits, height=height)
 
     @staticmethod
+    @payload.metered
     def radar(
             indicators: Sequence[dict],
             data: Sequence[Sequence[float]],
             series_names: Optional[Sequence[str]] = None,
             title: Optional[str] = None,
             height: str = "400px",
+            digits: Optional[int] = None,
             **kwargs
     ) -> None:
         """
@@ -709,52 +2370,16 @@ class ECharts:
           series_names: Optional names for each data series.
           title: Chart title (centered).
           height: CSS height of chart container.
+          digits: Round the numbers sent to this many significant digits (see `compact_option`);
+                  None (default) sends them exactly as labels and tooltips should show them.
           **kwargs: Any additional ECharts option overrides.
         """
-        series_data = []
-        for i, vals in enumerate(data):
-            name = series_names[i] if series_names else f"Series {i + 1}"
-            series_data.append({"value": vals, "name": name})
-
-        option = {
-            **({"title": {"text": title, "left": "center"}} if title else {}),
-            "tooltip": {
-                "confine": True
-            },
-            "toolbox": {'show': False},
-            "radar": {
-                "radius": 120,
-                "shape": 'circle',
-                "indicator": list(indicators),
-                "axisName": {
-                    "color": '#fc6203',
-                    # "backgroundColor": '#666',
-                    "borderRadius": 7,
-                    "padding": [5, 5],
-                    "fontSize": 14
-                },
-                "axisLabel": {
-                    "fontSize": 1
-                }
-
-            },
-            "series": [{
-                "type": "radar",
-                "data": series_data,
-                'itemStyle': {
-                    # 'color': '#F9713C' # this will make all the trials the same color
-                },
-                "areaStyle": {
-                    "opacity": 0.05
-                }
-            }
-            ],
-            **kwargs,
-        }
-
-        st_echarts(options=option, height=height)
+        option = build_radar_option(indicators=indicators, data=data, series_names=series_names, title=title,
+                                    **kwargs)
+        _st_echarts(option, digits=digits, height=height)
 
     @staticmethod
+    @payload.metered
     def kde(
             df: pd.DataFrame,
             column: str,
@@ -765,6 +2390,13 @@ class ECharts:
             height: str = "400px",
             bandwidth: Optional[float] = None,
             grid_size: int = 200,
+            engine: Literal["auto", "scipy", "fft"] = "auto",
+            workers: Optional[int] = None,
+            max_points: Optional[int] = DOWNSAMPLE_MAX_POINTS,
+            downsample_method: Literal["lttb", "minmax"] = "lttb",
+            dataset: bool = False,
+            large_data: Union[bool, dict, None] = None,
+            digits: Optional[int] = OPTION_DIGITS,
             show_metrics: bool = False,
             annotate_metrics: bool = False,
             annotate_offset: Optional[float] = None,
@@ -783,112 +2415,32 @@ class ECharts:
           height: CSS height of the chart.
           bandwidth: Bandwidth for gaussian_kde (passed to `bw_method`).
           grid_size: Number of x-points at which to evaluate the KDE.
+          engine: "scipy" (exact gaussian_kde), "fft" (binned, for large samples) or
+                  "auto" (fft for groups of KDE_FFT_MIN_ROWS values or more).
+          workers: Processes for very large groups (see `kde_groups`); default in-process.
+          max_points: Cap on points sent per curve when grid_size is larger (None: send all).
+          downsample_method: "lttb" (keeps the shape) or "minmax" (keeps every extreme).
+          dataset: Send the curves as columns of an ECharts `dataset` (one shared x column
+                   unless downsampling gives each curve its own x values).
+          large_data: Large-data hints per curve (see `large_data_hints`); None = automatic.
+          digits: Significant digits of the curve coordinates sent (see `compact_option`); None = full precision.
           show_metrics: If True, draws full vertical dashed lines at mean/median.
           annotate_metrics: If True, draws short dashed pointers labeled “Mean: x”/“Median: y”.
           annotate_offset: Horizontal data-unit offset for pointer lines (default 1% of x-span).
           annotate_label_offset: Vertical pixel offset for annotation labels (alternates up/down).
           **kwargs: Any additional ECharts option overrides.
         """
-        # 1) Prepare the x grid
-        vals_all = df[column].dropna().astype(float).values
-        xmin, xmax = vals_all.min(), vals_all.max()
-        xs = np.linspace(xmin, xmax, grid_size)
-
-        def get_metrics(vals: np.ndarray):
-            out = {'mean': float(vals.mean()), 'median': float(np.median(vals))}
-            return out
-
-        def build_markline_data(vals: np.ndarray, ys: np.ndarray):
-            entries = []
-            offs_x = annotate_offset if annotate_offset is not None else (xmax - xmin) * 0.01
-            metrics = get_metrics(vals)
-            for idx, (m, x) in enumerate(metrics.items()):
-                label = f"{m.capitalize()}: {x:.1f}"
-                # full vertical line
-                if show_metrics:
-                    entries.append({"name": label, "xAxis": x})
-                # horizontal pointer + bold label
-                if annotate_metrics:
-                    i = np.abs(xs - x).argmin()
-                    y = float(ys[i])
-                    y_off = annotate_label_offset * (1 if idx % 2 else -1)
-                    entries.append([
-                        {"coord": [x, y]},
-                        {
-                            "coord": [x + offs_x, y],
-                            "name": label,
-                            "label": {
-                                "show": True,
-                                "formatter": "{b}",
-                                "position": "end",
-                                "offset": [0, y_off],
-                                "fontWeight": "bold"
-                            }
-                        }
-                    ])
-            return entries
-
-        # 2) Build each series, baking median into the legend name
-        series_list = []
-        legend_data = []
-        groups = df.groupby(hue) if hue else [(None, df)]
-        for lvl, sub in groups:
-            arr = sub[column].dropna().astype(float).values
-            if len(arr) < 2:
-                continue
-
-            # compute KDE
-            kde = gaussian_kde(arr, bw_method=bandwidth)
-            ys = kde(xs)
-
-            # compute metrics
-            metrics = get_metrics(arr)
-            med = metrics['median']
-            # bake median into series name
-            base_name = str(lvl) if hue else column
-            series_name = f"{base_name} (Median: {med:.1f} days)"
-
-            cfg = {
-                "name": series_name,
-                "type": "line",
-                "smooth": True,
-                "data": list(zip(xs.tolist(), ys.tolist())),
-                "showSymbol": False,
-            }
-            # optional vertical lines & pointers
-            if show_metrics or annotate_metrics:
-                cfg["markLine"] = {
-                    "symbol": ["none", "none"],
-                    "lineStyle": {"type": "dashed", "opacity": 0.4},
-                    "data": build_markline_data(arr, ys)
-                }
-
-            series_list.append(cfg)
-            if hue:
-                legend_data.append(series_name)
-
-            # 3) Assemble the option
-
-            # **({"title": {"text": title, "left": "center"}} if title else {}),
-            # **({"legend": {"data": legend_data}} if hue else {}),
-            # Build title + legend with adjustable tops
-            title_cfg = {'text': title, 'left': 'center', 'top': title_top} if title else {}
-            legend_cfg = {'data': legend_data, 'orient': 'horizontal', 'left': 'center',
-                          'top': legend_top} if hue else {}
-
-            option = {
-                **({"title": title_cfg} if title_cfg else {}),
-                **({'legend': legend_cfg} if legend_cfg else {}),
-                "tooltip": {'show': False, "trigger": "axis", "axisPointer": {"type": "line"}},
-                "xAxis": {"type": "value", "name": column},
-                "yAxis": {"type": "value", "name": "Density"},
-                "series": series_list,
-                **kwargs
-            }
-
-        st_echarts(options=option, height=height)
+        option = build_kde_option(df=df, column=column, hue=hue, title=title, title_top=title_top,
+                                  legend_top=legend_top, bandwidth=bandwidth, grid_size=grid_size, engine=engine,
+                                  workers=workers, max_points=max_points, downsample_method=downsample_method,
+                                  dataset=dataset, large_data=large_data,
+                                  show_metrics=show_metrics, annotate_metrics=annotate_metrics,
+                                  annotate_offset=annotate_offset, annotate_label_offset=annotate_label_offset,
+                                  **kwargs)
+        _st_echarts(option, digits=digits, height=height)
 
     @staticmethod
+    @payload.metered
     def histogram(
             df: pd.DataFrame,
             column: str,
@@ -910,25 +2462,44 @@ class ECharts:
           height: CSS height of chart container.
           **kwargs: Any additional ECharts option overrides.
         """
-        vals = df[column].dropna().astype(float).values
-        counts, edges = np.histogram(vals, bins=bins, density=density)
-        labels = [f"{edges[i]:.1f}–{edges[i + 1]:.1f}" for i in range(len(counts))]
-
-        option = {
-            **({"title": {"text": title, "left": "center"}} if title else {}),
-            "tooltip": {"trigger": "axis", "formatter": "{b}: {c}"},
-            "xAxis": {"type": "category", "data": labels, "name": column},
-            "yAxis": {"type": "value", "name": "Density" if density else "Count"},
-            "series": [{
-                "type": "bar",
-                "data": counts.tolist(),
-            }],
-            **kwargs,
-        }
+        option = build_histogram_option(df=df, column=column, bins=bins, density=density, title=title, **kwargs)
+        _st_echarts(option, height=height)
+
+    @staticmethod
+    @payload.metered
+    def histogram_stream(
+            chunks,
+            column: str,
+            bins: Union[int, Sequence[float]] = 10,
+            range: Optional[tuple] = None,
+            density: bool = False,
+            title: Optional[str] = None,
+            height: str = "400px",
+            **kwargs
+    ) -> None:
+        """
+        Renders a Histogram of data too large to hold in memory, one chunk at a time.
 
-        st_echarts(options=option, height=height)
+        Same chart as `histogram` for the same values; see `histogram_stream`
+        (module level) for what `chunks` may be.
+
+        Args:
+          chunks: Iterable of DataFrames / Arrow batches / arrays, or a callable returning one.
+                  Must be re-iterable unless `bins` are edges or `range` is given.
+          column: Numeric column to bin.
+          bins: Number of bins, or the bin edges.
+          range: (min, max) of the bins; default the data's own (costs a first pass).
+          density: If True, show density instead of counts.
+          title: Chart title (centered).
+          height: CSS height of chart container.
+          **kwargs: Any additional ECharts option overrides.
+        """
+        option = build_histogram_stream_option(chunks, column=column, bins=bins, range=range, density=density,
+                                               title=title, **kwargs)
+        _st_echarts(option, height=height)
 
     @staticmethod
+    @payload.metered
     def text_stroke_animation(
             text: str,
             font_size: int = 80,
@@ -960,54 +2531,14 @@ class ECharts:
           height: CSS height of the chart container.
           **kwargs: Additional ECharts option overrides.
         """
-        # Default to centered positioning
-        if position is None:
-            position = {"left": "center", "top": "center"}
-
-        # Create the graphic text element with stroke and dash animation
-        elem = {
-            "type": "text",
-            **position,
-            "style": {
-                "text": text,
-                "fontSize": font_size,
-                "fontWeight": font_weight,
-                "lineDash": list(line_dash),
-                "lineDashOffset": 0,
-                "fill": fill_color,
-                "stroke": stroke_color,
-                "lineWidth": stroke_width
-            },
-            "keyframeAnimation": {
-                "duration": duration,
-                "loop": loop,
-                "keyframes": [
-                    {
-                        "percent": 0.7,
-                        "style": {
-                            "fill": fill_color,
-                            "lineDashOffset": line_dash[1],
-                            "lineDash": [line_dash[1], 0]
-                        }
-                    },
-                    {
-                        "percent": 0.8,
-                        "style": {"fill": fill_color}
-                    },
-                    {
-                        "percent": 1,
-                        "style": {"fill": stroke_color}
-                    }
-                ]
-            }
-        }
-
-        # Assemble the option with the graphic element
-        option = {"graphic": {"elements": [elem]}, **kwargs}
-
-        st_echarts(options=option, height=height)
+        option = build_text_stroke_option(text=text, font_size=font_size, font_weight=font_weight,
+                                          stroke_color=stroke_color, stroke_width=stroke_width,
+                                          line_dash=line_dash, fill_color=fill_color, duration=duration,
+                                          loop=loop, position=position, **kwargs)
+        _st_echarts(option, height=height)
 
     @staticmethod
+    @payload.metered
     def sunburst(
             df: pd.DataFrame,
             path: list[str],
@@ -1017,6 +2548,7 @@ class ECharts:
             center: list[str] | None = None,
             base_color: str = "#5470C6",
             height: str = "500px",
+            digits: Optional[int] = None,
             **kwargs
     ) -> None:
         """
@@ -1031,6 +2563,8 @@ class ECharts:
           center: [x,y] center position (e.g. ['50%','50%']).
           base_color: Hex base color—child slices get progressively lighter.
           height: Container height.
+          digits: Round the numbers sent to this many significant digits (see `compact_option`);
+                  None (default) sends them exactly as labels and tooltips should show them.
           **kwargs: Other ECharts options to merge.
 
         Example:
@@ -1042,61 +2576,12 @@ class ECharts:
                 radius=["20%","80%"]
             )
         """
-        import colorsys
-
-        # defaults
-        radius = radius or ["20%", "75%"]
-        center = center or ["50%", "50%"]
-
-        # build tree
-        tree: dict = {}
-        for _, row in df.iterrows():
-            node = tree
-            for lvl in path:
-                key = row[lvl] if pd.notna(row[lvl]) else "<NA>"
-                if key not in node:
-                    node[key] = {"__value": 0, "__children": {}}
-                node[key]["__value"] += float(row[values])
-                node = node[key]["__children"]
-
-        def build_nodes(subtree: dict, depth: int = 0) -> list:
-            out = []
-            for name, meta in subtree.items():
-                item = {
-                    "name": name,
-                    "value": meta["__value"],
-                    "itemStyle": {
-                        # compute a lighter variant per depth
-                        "color": lighten_hex(base_color, depth / (len(path)))
-                    },
-                    "label": {
-                        "formatter": "{b}: {c}",
-                        "rotate": "radial"
-                    }
-                }
-                children = build_nodes(meta["__children"], depth + 1)
-                if children:
-                    item["children"] = children
-                out.append(item)
-            return out
-
-        data = build_nodes(tree)
-
-        option = {
-            "title": {"text": title, "left": "center"},
-            "series": [{
-                "type": "sunburst",
-                "radius": radius,
-                "center": center,
-                "data": data,
-                "label": {"rotate": "radial"}
-            }],
-            **kwargs
-        }
-
-        st_echarts(options=option, height=height)
+        option = build_sunburst_option(df=df, path=path, values=values, title=title, radius=radius,
+                                       center=center, base_color=base_color, **kwargs)
+        _st_echarts(option, digits=digits, height=height)
 
     @staticmethod
+    @payload.metered
     def sankey_multi(
             df: pd.DataFrame,
             levels: Sequence[str],
@@ -1107,6 +2592,10 @@ class ECharts:
             orient: Literal["horizontal", "vertical"] = "horizontal",
             emphasis: Optional[dict] = None,
             height: str = "400px",
+            min_flow: Optional[float] = None,
+            top_k_per_source: Optional[int] = None,
+            other_label: str = "Other",
+            digits: Optional[int] = None,
             **kwargs
     ) -> None:
         """
@@ -1134,14 +2623,24 @@ class ECharts:
             ECharts emphasis settings, e.g. {"focus":"adjacency"} to highlight connected flows.
         height : str, default "400px"
             CSS height for the chart container.
+        min_flow : float, optional
+            Links carrying less than this are folded into an "Other" node.
+        top_k_per_source : int, optional
+            Keep only each source's k largest links per stage; fold the rest into "Other".
+        other_label : str, default "Other"
+            Label for folded flows; suffixed with the stage column, e.g. "Other (City)".
+        digits : int, optional
+            Round the flows sent to this many significant digits (see `compact_option`);
+            None (default) sends them exactly as labels and tooltips should show them.
         **kwargs
             Any other top-level ECharts option entries to merge in, e.g.
             `backgroundColor`, custom `tooltip`, `series[0].color`, etc.
 
         Behavior
         --------
-        1. **Aggregate** – For each adjacent pair in `levels`, sums `value` by (src, tgt).
-        2. **Nodes** – Collects the unique union of all level values.
+        1. **Aggregate** – For each adjacent pair in `levels`, sums `value` by (src, tgt),
+           then prunes/folds small flows if `min_flow` / `top_k_per_source` are set.
+        2. **Nodes** – Collects the unique names used by the aggregated links.
         3. **Links** – Builds the ECharts-style `{"source":…, "target":…, "value":…}` list.
         4. **Render** – Calls `st_echarts(option, height=height)`.
 
@@ -1162,40 +2661,8 @@ class ECharts:
         )
         ```
         """
-        # 1) build aggregated links for each adjacent pair of levels
-        links = []
-        for src_col, tgt_col in zip(levels, levels[1:]):
-            grouped = (
-                df
-                .groupby([src_col, tgt_col], as_index=False)[value]
-                .sum()
-            )
-            for _, row in grouped.iterrows():
-                links.append({
-                    "source": str(row[src_col]),
-                    "target": str(row[tgt_col]),
-                    "value": float(row[value])
-                })
-
-        # 2) collect all unique node names across every level
-        unique_nodes = pd.unique(df[levels].values.ravel())
-        nodes = [{"name": str(n)} for n in unique_nodes]
-
-        # 3) assemble the full ECharts option
-        option = {
-            "tooltip": {"trigger": "item", "triggerOn": "mousemove"},
-            "series": [{
-                "type": "sankey",
-                "layout": layout,
-                "orient": orient,
-                "data": nodes,
-                "links": links,
-                "nodeWidth": node_width,
-                "nodeGap": node_gap,
-                **({"emphasis": emphasis} if emphasis is not None else {})
-            }],
-            **kwargs,
-        }
-
-        # 4) render via Streamlit
-        st_echarts(options=option, height=height)
+        option = build_sankey_option(df=df, levels=levels, value=value, node_width=node_width,
+                                     node_gap=node_gap, layout=layout, orient=orient, emphasis=emphasis,
+                                     min_flow=min_flow, top_k_per_source=top_k_per_source,
+                                     other_label=other_label, **kwargs)
+        _st_echarts(option, digits=digits, height=height)
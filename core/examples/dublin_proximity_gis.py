@@ -1,6 +1,5 @@
 # sections/projects/proximity_dublin.py
 import json
-import geopandas as gpd
 import pandas as pd
 import streamlit as st
 from core.charts import GIS
@@ -9,6 +8,8 @@ SHP_PATH = "./core/references/gis/counties.shp"
 
 @st.cache_data(show_spinner=False)
 def load_geo(shp=SHP_PATH, simplify_m: int = 250):
+    import geopandas as gpd
+
     gdf = gpd.read_file(shp)                     # ❶ read once
     # pick a name column
     name_col = next((c for c in gdf.columns if "county" in c.lower()), None) or gdf.select_dtypes("object").columns[0]
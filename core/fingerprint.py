@@ -0,0 +1,104 @@
+# ./core/fingerprint.py
+"""
+Cheap, stable content keys for DataFrames, used by the chart/GIS caches.
+
+`fingerprint(df, columns)` hashes only the columns a chart reads:
+
+  * numeric, bool and datetime columns hash their raw buffer in place (no
+    copy, no per-row work);
+  * categoricals hash their codes plus the (small) category list;
+  * strings/objects go through `pd.util.hash_pandas_object`, which is
+    vectorised but has to touch every value.
+
+Column names, dtypes and the row count are always part of the key. With
+`sample=N`, frames longer than N rows are keyed on N evenly spaced rows plus
+the first and last block; that is far cheaper for huge frames but will miss
+an edit that lands between sampled rows, so use it only for frames that are
+replaced rather than mutated in place.
+
+Benchmark: ``python -m benchmarks.fingerprint``.
+"""
+
+import hashlib
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+_EDGE_ROWS = 1024  # rows always hashed at both ends when sampling
+
+
+def _update_array(h, values: np.ndarray) -> None:
+    h.update(np.ascontiguousarray(values).view(np.uint8).data)
+
+
+def _update_column(h, col: pd.Series, positions: Optional[np.ndarray]) -> None:
+    dtype = col.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = col.cat.codes.to_numpy()
+        _update_array(h, codes if positions is None else codes[positions])
+        _update_array(h, pd.util.hash_pandas_object(col.cat.categories.to_series(), index=False).to_numpy())
+    elif dtype.kind in "biufcmM" and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        values = col.to_numpy()
+        _update_array(h, values if positions is None else values[positions])
+    else:
+        # strings, objects, nullable extension types
+        if positions is not None:
+            col = col.take(positions)
+        _update_array(h, pd.util.hash_pandas_object(col, index=False).to_numpy())
+
+
+def _update_index(h, index: pd.Index, positions: Optional[np.ndarray]) -> None:
+    if isinstance(index, pd.RangeIndex):
+        h.update(repr((index.start, index.stop, index.step)).encode())
+        return
+    if positions is not None:
+        index = index.take(positions)
+    _update_array(h, pd.util.hash_pandas_object(index, index=False).to_numpy())
+
+
+def _sample_positions(n: int, sample: int) -> np.ndarray:
+    """Sorted, distinct row positions: both edges plus an even stride (needs sample < n)."""
+    edge = min(_EDGE_ROWS, sample // 4)
+    # at most one point per row in between, so the floored positions stay distinct
+    middle = np.linspace(edge, n - edge - 1, max(sample - 2 * edge, 1)).astype(np.int64)
+    return np.concatenate([np.arange(edge), middle, np.arange(n - edge, n)])
+
+
+def fingerprint(
+        df: pd.DataFrame | pd.Series,
+        columns: Optional[Iterable[str]] = None,
+        *,
+        sample: Optional[int] = None,
+        index: bool = True,
+) -> str:
+    """
+    Hex key that changes whenever the data in `columns` (default: all) changes.
+
+    :param df:      DataFrame (or Series) to key.
+    :param columns: Only these columns are hashed, in the order given.
+    :param sample:  Hash at most this many rows of a longer frame (see module doc).
+    :param index:   Include the index (a RangeIndex costs nothing).
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    cols = list(df.columns if columns is None else dict.fromkeys(columns))
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"Columns not in frame: {missing}")
+
+    # SHA-1 is hardware accelerated on most CPUs; this is a cache key, not a signature
+    h = hashlib.sha1()
+    h.update(repr((len(df), [(str(c), str(df[c].dtype)) for c in cols])).encode())
+
+    positions = None
+    if sample is not None and len(df) > sample:
+        positions = _sample_positions(len(df), sample)
+        h.update(b"sampled")
+        _update_array(h, positions)
+
+    if index:
+        _update_index(h, df.index, positions)
+    for c in cols:
+        _update_column(h, df[c], positions)
+    return h.hexdigest()
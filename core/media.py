@@ -0,0 +1,304 @@
+# ./core/media.py
+"""
+Media publishing helpers.
+
+Local media (videos, GIFs, posters) is published through Streamlit's media
+endpoint under a content hash instead of being inlined as base64 on every
+rerun. The browser fetches each file once and, because the URL carries the
+hash as a ``?v=`` version, caches it long-term. When no Streamlit server is
+running (bare ``python`` runs, headless tooling) the helpers fall back to
+``data:`` URIs so callers never have to care which path was taken.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+_MIME_TYPES = {
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".gif": "image/gif",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+}
+
+_CHUNK = 1 << 20
+
+# written by `python -m core.build_assets`
+MANIFEST_PATH = Path("core") / "references" / "build" / "manifest.json"
+
+
+def mime_type(path) -> str:
+    """Mimetype for a media file, based on its extension."""
+    ext = Path(path).suffix.lower()
+    return _MIME_TYPES.get(ext) or mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+
+
+@lru_cache(maxsize=256)
+def _digest(path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def asset_digest(path) -> str:
+    """
+    Short content hash of a file.
+
+    Memoised on (path, mtime, size), so repeated calls for an unchanged file
+    cost a `stat` instead of a full read.
+    """
+    p = str(Path(path).resolve())
+    stat = os.stat(p)
+    return _digest(p, stat.st_mtime_ns, stat.st_size)
+
+
+class EncodedAssetCache:
+    """
+    Process-wide LRU of base64-encoded files, bounded by a byte budget.
+
+    Entries are keyed by (path, mtime, size, mimetype), so an edited file is
+    re-encoded on next use. Sessions asking for the same file share one
+    string; concurrent misses for the same key encode it only once.
+    Files bigger than the whole budget are encoded but not kept.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._key_locks: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, path, mimetype: str | None = None) -> str:
+        """
+        Base64 for `path`; as a full ``data:`` URI when `mimetype` is given.
+        """
+        p = str(Path(path).resolve())
+        stat = os.stat(p)
+        key = (p, stat.st_mtime_ns, stat.st_size, mimetype)
+
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:  # someone else may have filled it while we waited
+                if key in self._entries:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+                self.misses += 1
+
+            encoded = base64.b64encode(Path(p).read_bytes()).decode("utf-8")
+            if mimetype:
+                encoded = f"data:{mimetype};base64,{encoded}"
+
+            with self._lock:
+                self._key_locks.pop(key, None)
+                if len(encoded) <= self.max_bytes:
+                    self._entries[key] = encoded
+                    self.bytes += len(encoded)
+                    self._evict()
+            return encoded
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _evict(self) -> None:
+        # callers hold self._lock
+        while self.bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= len(old)
+            self.evictions += 1
+
+
+# Budget is configurable per deployment, e.g. ASSET_CACHE_MAX_BYTES=134217728
+encoded_cache = EncodedAssetCache(int(os.environ.get("ASSET_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+
+
+def data_uri(path, mimetype: str | None = None) -> str:
+    """Inline `path` as a base64 ``data:`` URI (the no-server fallback)."""
+    return encoded_cache.get(path, mimetype or mime_type(path))
+
+
+def asset_url(path, mimetype: str | None = None) -> str | None:
+    """
+    Publish `path` and return a cacheable URL for it.
+
+    Uses the byte-range server in `core.streaming` when MEDIA_SERVER_PORT is
+    set, otherwise Streamlit's media endpoint. Both answer Range requests,
+    and MP4s are remuxed for progressive playback first if needed.
+
+    Media-endpoint URLs are relative (``media/<sha224>.mp4?v=<digest>``) so
+    they resolve under whatever base path the app is served from, like the
+    ``app/static/...`` font URLs in `.streamlit/config.toml`. The ``v`` query
+    makes Tornado send a far-future ``Cache-Control`` header.
+
+    Returns None when there is no running server/session to publish to.
+    """
+    from streamlit import runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from core import streaming
+
+    url = streaming.asset_url(path)
+    if url:
+        return url
+
+    if not runtime.exists() or get_script_run_ctx() is None:
+        return None
+
+    digest = asset_digest(path)
+    try:
+        url = runtime.get_instance().media_file_mgr.add(
+            streaming.playable_path(path), mimetype or mime_type(path), coordinates=f"core.media.{digest}"
+        )
+    except Exception:
+        _LOGGER.exception("Could not publish %s, falling back to a data URI", path)
+        return None
+    return f"{url.lstrip('/')}?v={digest}"
+
+
+def media_src(path, mimetype: str | None = None) -> str:
+    """Best available `src` for a local file: media URL, else data URI."""
+    return asset_url(path, mimetype) or data_uri(path, mimetype)
+
+
+# ————————————————————————————————————————————————————————
+# Build manifest (renditions, posters, GIF -> video)
+# ————————————————————————————————————————————————————————
+def manifest_key(path) -> str:
+    """Manifest key for a repo path: "./core/x.gif" -> "core/x.gif"."""
+    return Path(os.path.normpath(path)).as_posix()
+
+
+@lru_cache(maxsize=4)
+def _read_manifest(path: str, mtime_ns: int) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lookup(path) -> dict | None:
+    """
+    Build-manifest entry for a local file, or None.
+
+    None also covers a missing manifest, a remote URL, and an entry built from
+    an older version of the file (its digest no longer matches).
+    """
+    try:
+        stat = os.stat(MANIFEST_PATH)
+        if not Path(path).is_file():
+            return None
+        entry = _read_manifest(str(MANIFEST_PATH), stat.st_mtime_ns)["assets"].get(manifest_key(path))
+    except (OSError, ValueError, KeyError):
+        return None
+    if not entry or entry.get("digest") != asset_digest(path):
+        return None
+    return entry
+
+
+def pick_rendition(renditions: list[dict], max_width_px: int) -> dict | None:
+    """Smallest rendition at least `max_width_px` wide, else the widest one."""
+    available = [r for r in renditions
+                 if all(Path(r[k]).is_file() for k in ("path", "mp4", "webm") if k in r)]
+    if not available:
+        return None
+    fitting = [r for r in available if r["width"] >= max_width_px]
+    if fitting:
+        return min(fitting, key=lambda r: r["width"])
+    return max(available, key=lambda r: r["width"])
+
+
+def video_rendition(path, max_width_px: int) -> dict | None:
+    """Best {"width", "mp4", "webm"} video rendition of `path`, if built."""
+    entry = lookup(path)
+    return pick_rendition(entry.get("videos", []), max_width_px) if entry else None
+
+
+def rendition_path(path, max_width_px: int) -> str:
+    """Best still-image rendition of `path` for `max_width_px`, else `path`."""
+    entry = lookup(path)
+    best = pick_rendition(entry.get("images", []), max_width_px) if entry else None
+    return best["path"] if best else path
+
+
+class AssetRegistry:
+    """
+    Per-page record of the media assets emitted so far, keyed by content hash.
+
+    Each distinct file is published/encoded once per page; every later
+    reference (a second <source>, or the same clip in another card) reuses
+    that `src`. `duplicates()` lists the assets referenced more than once.
+    """
+
+    def __init__(self):
+        self._assets: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def reset(self) -> None:
+        self._assets.clear()
+
+    def src(self, path, mimetype: str | None = None) -> str:
+        """`src` for `path`, publishing/encoding it only on first reference."""
+        digest = asset_digest(path)
+        entry = self._assets.get(digest)
+        if entry is None:
+            entry = self._assets[digest] = {"src": media_src(path, mimetype), "paths": [], "refs": 0}
+        if str(path) not in entry["paths"]:
+            entry["paths"].append(str(path))
+        entry["refs"] += 1
+        return entry["src"]
+
+    def duplicates(self) -> dict[str, list[str]]:
+        """digest -> paths, for assets referenced more than once on the page."""
+        return {d: e["paths"] for d, e in self._assets.items() if e["refs"] > 1}
+
+
+def page_registry() -> AssetRegistry:
+    """The current session's registry (a throwaway one outside a session)."""
+    import streamlit as st
+
+    try:
+        return st.session_state.setdefault("media_registry", AssetRegistry())
+    except Exception:
+        # bare mode: no session state to hang the registry off
+        return AssetRegistry()
+
+
+def reset_page_registry() -> None:
+    """Forget the previous run's assets; call once before rendering a page."""
+    page_registry().reset()
@@ -0,0 +1,114 @@
+# ./core/palette.py
+"""
+Colour tables shared by the chart helpers, computed once per process.
+
+  * `colormap_hex(name, steps)` - a matplotlib colormap sampled into `steps`
+    hex colours (what `GIS.plot(cmap=...)` hands to the visualMap);
+  * `colors_hex(colors)` - any matplotlib colour specs as hex;
+  * `lighten(colors, fractions)` - HLS lightening toward white, vectorised over
+    both arguments; bit-for-bit the same as the `colorsys` round trip;
+  * `depth_palette(base_color, levels)` - one lightened colour per sunburst
+    depth, so a tree with tens of thousands of nodes does the colour math
+    `levels` times, not once per node.
+
+The tables are memoised on their (hashable) arguments and returned as tuples,
+so callers must not expect to mutate them. matplotlib is only imported by the
+colormap lookups; lightening is plain numpy.
+"""
+
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+
+def _to_hex(rgb: np.ndarray) -> tuple[str, ...]:
+    """'#rrggbb' for each row of an (n, 3+) float array in [0, 1] (rounded like `mcolors.to_hex`)."""
+    ints = np.round(np.asarray(rgb, dtype=float)[:, :3] * 255).astype(int)
+    return tuple("#%02x%02x%02x" % tuple(row) for row in ints.tolist())
+
+
+@lru_cache(maxsize=64)
+def colormap_hex(name: str, steps: int | None = None) -> tuple[str, ...]:
+    """`steps` evenly spaced colours of the matplotlib colormap `name` (its own N if None)."""
+    import matplotlib
+
+    cmap = matplotlib.colormaps[name]
+    if steps:
+        cmap = cmap.resampled(steps)
+    return _to_hex(cmap(np.arange(cmap.N)))
+
+
+@lru_cache(maxsize=256)
+def _colors_hex(colors: tuple) -> tuple[str, ...]:
+    from matplotlib import colors as mcolors
+
+    return _to_hex(mcolors.to_rgba_array(list(colors)))
+
+
+def colors_hex(colors: Sequence) -> tuple[str, ...]:
+    """Hex for a sequence of colour specs (names, hex strings, RGB(A) tuples)."""
+    return _colors_hex(tuple(tuple(c) if isinstance(c, list) else c for c in colors))
+
+
+def _rgb_to_hls(r, g, b):
+    """`colorsys.rgb_to_hls` over arrays, same operations in the same order."""
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+    grey = rangec == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(l <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = (h / 6.0) % 1.0
+    return np.where(grey, 0.0, h), l, np.where(grey, 0.0, s)
+
+
+def _hue_channel(m1, m2, hue):
+    hue = hue % 1.0
+    return np.where(hue < 1 / 6, m1 + (m2 - m1) * hue * 6.0,
+                    np.where(hue < 0.5, m2,
+                             np.where(hue < 2 / 3, m1 + (m2 - m1) * (2 / 3 - hue) * 6.0, m1)))
+
+
+def _hls_to_rgb(h, l, s):
+    """`colorsys.hls_to_rgb` over arrays."""
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+    grey = s == 0.0
+    return tuple(np.where(grey, l, _hue_channel(m1, m2, h + shift)) for shift in (1 / 3, 0.0, -1 / 3))
+
+
+def lighten(colors: str | Sequence[str], fractions: float | Sequence[float]) -> np.ndarray:
+    """
+    Move each hex colour `fraction` of the way to full HLS lightness.
+
+    `colors` and `fractions` broadcast against each other; returns an array of
+    '#rrggbb' strings (channels truncated, as `lighten_hex` always did).
+    """
+    codes = np.char.lstrip(np.atleast_1d(np.asarray(colors, dtype=str)), "#")
+    ints = np.array([[int(c[i:i + 2], 16) for i in (0, 2, 4)] for c in codes.ravel()], dtype=float)
+    ints = ints.reshape(codes.shape + (3,)) / 255
+    h, l, s = _rgb_to_hls(ints[..., 0], ints[..., 1], ints[..., 2])
+    fractions = np.asarray(fractions, dtype=float)
+    h, l, s, fractions = np.broadcast_arrays(h, l, s, fractions)
+    l = np.minimum(1, l + fractions * (1 - l))
+    rgb = np.stack(_hls_to_rgb(h, l, s), axis=-1)
+    ints = (rgb.reshape(-1, 3) * 255).astype(int)
+    return np.array(["#%02x%02x%02x" % tuple(row) for row in ints.tolist()], dtype=object).reshape(rgb.shape[:-1])
+
+
+def lighten_hex(hex_color: str, fraction: float) -> str:
+    """Return a lighter hex string by interpolating toward white."""
+    return str(lighten(hex_color, fraction)[0])
+
+
+@lru_cache(maxsize=256)
+def depth_palette(base_color: str, levels: int) -> tuple[str, ...]:
+    """`base_color` lightened by depth / levels, for depth 0 .. levels - 1."""
+    return tuple(lighten(base_color, np.arange(levels) / levels).tolist())
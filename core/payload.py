@@ -0,0 +1,228 @@
+# ./core/payload.py
+"""
+Payload accounting for everything the UI helpers push to the browser.
+
+The `core.utils` emitters send their HTML/CSS through `markdown()` and the
+`core.charts` renderers report their option size through `count()`; both
+attribute the bytes to the element being measured (`@metered` /
+`measure()`), together with the time it took. Time is self time: a metered
+call made inside another (`center_gif` -> `hero_video`) is subtracted from
+the outer one, so the breakdown adds up to the time actually spent. Records
+are kept per page, per session, and checked against a budget:
+
+    PAYLOAD_BUDGET_BYTES=1500000   # per page; unset = no budget
+    PAYLOAD_BUDGET_MODE=fail       # "warn" (default) logs, "fail" raises
+
+Report for every page registered in main.py, rendered headlessly:
+
+    python -m core.payload [--budget BYTES] [--fail]
+"""
+
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PayloadBudgetExceeded(RuntimeError):
+    """Raised in "fail" mode once a page's payload passes the budget."""
+
+
+class PayloadMeter:
+    """Bytes and self time per element, grouped by page."""
+
+    def __init__(self, budget: int | None = None, mode: str = "warn"):
+        self.budget = budget
+        self.mode = mode
+        self.pages: dict[str, list[dict]] = {}
+        self.page_seconds: dict[str, float] = {}
+        self.page = "unknown"
+        self._stack: list[dict] = []
+        self._started = time.perf_counter()
+        self._over_budget = False
+
+    def begin_page(self, name: str) -> None:
+        self.page = name
+        self.pages[name] = []
+        self._stack.clear()
+        self._started = time.perf_counter()
+        self._over_budget = False
+
+    def end_page(self) -> None:
+        self.page_seconds[self.page] = time.perf_counter() - self._started
+
+    def open(self, element: str) -> dict:
+        record = {"element": element, "bytes": 0, "seconds": 0.0, "_t0": time.perf_counter(), "_nested": 0.0}
+        self._stack.append(record)
+        return record
+
+    def close(self, record: dict) -> None:
+        elapsed = time.perf_counter() - record.pop("_t0")
+        record["seconds"] = elapsed - record.pop("_nested")  # self time: nested elements report their own
+        if self._stack and self._stack[-1] is record:
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["_nested"] += elapsed
+        self.pages.setdefault(self.page, []).append(record)
+
+    def count(self, nbytes: int, element: str = "markdown") -> None:
+        """Attribute `nbytes` to the element being measured (or `element`)."""
+        if self._stack:
+            self._stack[-1]["bytes"] += nbytes
+        else:
+            self.pages.setdefault(self.page, []).append({"element": element, "bytes": nbytes, "seconds": 0.0})
+        self._check_budget()
+
+    def total(self, page: str | None = None) -> int:
+        page = self.page if page is None else page
+        return sum(r["bytes"] for r in self.pages.get(page, []))
+
+    def breakdown(self, page: str | None = None) -> list[tuple[str, int, int, float]]:
+        """(element, calls, bytes, seconds) for a page, heaviest first."""
+        rows: dict[str, list] = {}
+        for r in self.pages.get(self.page if page is None else page, []):
+            row = rows.setdefault(r["element"], [0, 0, 0.0])
+            row[0] += 1
+            row[1] += r["bytes"]
+            row[2] += r["seconds"]
+        return sorted(((k, *v) for k, v in rows.items()), key=lambda x: -x[2])
+
+    def _check_budget(self) -> None:
+        if not self.budget or self._over_budget:
+            return
+        total = self.total()
+        if total <= self.budget:
+            return
+        self._over_budget = True
+        msg = f"Page '{self.page}' sent {total:,} bytes, over its {self.budget:,} byte budget"
+        if self.mode == "fail":
+            raise PayloadBudgetExceeded(msg)
+        _LOGGER.warning(msg)
+
+
+def _budget_from_env() -> tuple[int | None, str]:
+    budget = os.environ.get("PAYLOAD_BUDGET_BYTES")
+    return (int(budget) if budget else None), os.environ.get("PAYLOAD_BUDGET_MODE", "warn")
+
+
+_bare_meter = PayloadMeter(*_budget_from_env())
+
+
+def page_meter() -> PayloadMeter:
+    """The current session's meter (a process-wide one in bare mode)."""
+    try:
+        return st.session_state.setdefault("payload_meter", PayloadMeter(*_budget_from_env()))
+    except Exception:
+        return _bare_meter
+
+
+@contextmanager
+def measure(element: str):
+    """Attribute everything emitted inside the block to `element`."""
+    meter = page_meter()
+    record = meter.open(element)
+    try:
+        yield record
+    finally:
+        meter.close(record)
+
+
+def metered(func):
+    """Decorator: measure each call of an emitter under its name."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with measure(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def count(nbytes: int, element: str = "markdown") -> None:
+    page_meter().count(nbytes, element)
+
+
+def markdown(body: str, container=None, element: str = "markdown") -> None:
+    """`st.markdown(body, unsafe_allow_html=True)`, with its size recorded."""
+    count(len(body.encode("utf-8")), element)
+    (container or st).markdown(body, unsafe_allow_html=True)
+
+
+# ————————————————————————————————————————————————————————
+# Headless report
+# ————————————————————————————————————————————————————————
+def _render_page(url_path: str | None, timeout: float):
+    from streamlit.testing.v1 import AppTest
+    from streamlit.util import calc_md5
+
+    at = AppTest.from_file("main.py", default_timeout=timeout)
+    if url_path is not None:
+        # st.navigation runs the page whose script hash is requested;
+        # callable pages hash their url_path
+        at._page_hash = calc_md5(url_path)
+    at.run()
+    return at
+
+
+def render_report(timeout: float = 120) -> dict[str, PayloadMeter | str]:
+    """
+    Render every page registered in main.py with AppTest.
+
+    Returns url_path -> that page's meter, or an error message. A first run of
+    the default page fills `st.session_state["pages"]`, which lists them all.
+    """
+    try:
+        url_paths = list(_render_page(None, timeout).session_state["pages"])
+    except KeyError:
+        return {"": "error: main.py did not register its pages"}
+
+    results = {}
+    for url_path in url_paths:
+        at = _render_page(url_path, timeout)
+        try:
+            meter = at.session_state["payload_meter"]
+        except KeyError:
+            meter = None
+        if at.exception:
+            results[url_path] = f"error: {at.exception[0].message}"
+        elif meter is None:
+            results[url_path] = "error: page did not record a payload"
+        else:
+            results[url_path] = meter
+    return results
+
+
+def format_report(results: dict, budget: int | None = None) -> str:
+    lines = []
+    for url_path, meter in results.items():
+        label = f"/{url_path}"
+        if isinstance(meter, str):
+            lines += [f"{label}: {meter}", ""]
+            continue
+        total = meter.total()
+        flag = "  OVER BUDGET" if budget and total > budget else ""
+        seconds = meter.page_seconds.get(meter.page, 0.0)
+        lines.append(f"{label}: {total / 1024:,.1f} KB in {seconds * 1000:,.0f} ms{flag}")
+        for element, calls, nbytes, secs in meter.breakdown():
+            lines.append(f"  {element:<40} {calls:>4}x {nbytes / 1024:>10,.1f} KB {secs * 1000:>8,.1f} ms")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Per-page payload weight of the portfolio.")
+    parser.add_argument("--budget", type=int, default=None, help="per-page byte budget")
+    parser.add_argument("--fail", action="store_true", help="exit non-zero if a page errors or is over budget")
+    args = parser.parse_args()
+
+    report = render_report()
+    print(format_report(report, args.budget))
+    over = [p for p, m in report.items()
+            if isinstance(m, str) or (args.budget and m.total() > args.budget)]
+    sys.exit(1 if args.fail and over else 0)
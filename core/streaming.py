@@ -0,0 +1,284 @@
+# ./core/streaming.py
+"""
+Byte-range video delivery.
+
+`RangeFileHandler` is a small Tornado handler that serves published files
+straight from disk by content hash. ``Range`` requests get ``206 Partial
+Content`` read in chunks, so a video starts after its first few hundred KB
+and a seek only fetches the bytes it needs. Responses are marked
+``immutable`` because the URL changes whenever the file does.
+
+Streamlit's own ``/media`` endpoint (the default route in `core.media`) also
+honours ``Range`` but keeps every file in memory. Set ``MEDIA_SERVER_PORT``
+(plus ``MEDIA_BASE_URL`` when it sits behind a proxy) to serve media from
+here instead. `make_app()` is plain Tornado, so the route can be exercised
+with ``tornado.testing.AsyncHTTPTestCase`` and no network.
+
+MP4s only play progressively when their ``moov`` atom comes before
+``mdat``. `playable_path()` remuxes files that have it at the end into a
+temp copy (a lossless qt-faststart style move) before they are published.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+
+import tornado.web
+from streamlit.web.server.routes import allow_all_cross_origin_requests, is_allowed_origin
+
+from core.media import asset_digest, mime_type
+
+_LOGGER = logging.getLogger(__name__)
+
+# "<digest><ext>" -> absolute path of the file to stream
+_INDEX: dict[str, str] = {}
+_VERSIONS: dict[str, str] = {}  # absolute path -> digest (used as the ETag)
+_server_lock = threading.Lock()
+_server_base_url: str | None = None
+_server_failed = False  # don't retry (and wait) on every asset once the listen has failed
+
+_FASTSTART_DIR = Path(tempfile.gettempdir()) / "portfolio-faststart"
+_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_COPY_CHUNK = 1 << 20
+
+
+# ————————————————————————————————————————————————————————
+# MP4 faststart
+# ————————————————————————————————————————————————————————
+def _top_level_boxes(path) -> list[tuple[bytes, int, int]]:
+    """(type, offset, size) of each top-level MP4 box."""
+    boxes = []
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset + 8 <= total:
+            f.seek(offset)
+            size, kind = struct.unpack(">I4s", f.read(8))
+            if size == 1:
+                size = struct.unpack(">Q", f.read(8))[0]
+            elif size == 0:
+                size = total - offset
+            if size < 8:
+                raise ValueError(f"Corrupt MP4 box at offset {offset} in {path}")
+            boxes.append((kind, offset, size))
+            offset += size
+    return boxes
+
+
+def is_faststart(path) -> bool:
+    """True if `path` is not an MP4, or its `moov` precedes the first `mdat`."""
+    if Path(path).suffix.lower() != ".mp4":
+        return True
+    kinds = [kind for kind, _, _ in _top_level_boxes(path)]
+    if b"moov" not in kinds or b"mdat" not in kinds:
+        return True
+    return kinds.index(b"moov") < kinds.index(b"mdat")
+
+
+def _shift_chunk_offsets(buf: bytearray, start: int, end: int, delta: int) -> None:
+    """Add `delta` to every stco/co64 entry inside buf[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", buf, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", buf, pos + 8)[0]
+            header = 16
+        if size < header:
+            raise ValueError("Corrupt box inside moov")
+        if kind in _CONTAINERS:
+            _shift_chunk_offsets(buf, pos + header, pos + size, delta)
+        elif kind == b"stco":
+            count = struct.unpack_from(">I", buf, pos + header + 4)[0]
+            first = pos + header + 8
+            for i in range(count):
+                new = struct.unpack_from(">I", buf, first + 4 * i)[0] + delta
+                if new > 0xFFFFFFFF:
+                    raise ValueError("Chunk offset overflows stco; needs co64")
+                struct.pack_into(">I", buf, first + 4 * i, new)
+        elif kind == b"co64":
+            count = struct.unpack_from(">I", buf, pos + header + 4)[0]
+            first = pos + header + 8
+            for i in range(count):
+                old = struct.unpack_from(">Q", buf, first + 8 * i)[0]
+                struct.pack_into(">Q", buf, first + 8 * i, old + delta)
+        pos += size
+
+
+def faststart(src, dst) -> None:
+    """
+    Write a copy of MP4 `src` to `dst` with `moov` moved in front of the media.
+
+    Only the box order and chunk offsets change; the encoded streams are copied
+    byte for byte.
+    """
+    boxes = _top_level_boxes(src)
+    kinds = [kind for kind, _, _ in boxes]
+    if b"moof" in kinds:
+        raise ValueError("Fragmented MP4s are already streamable")
+    moov_kind, moov_offset, moov_size = boxes[kinds.index(b"moov")]
+
+    with open(src, "rb") as f:
+        f.seek(moov_offset)
+        moov = bytearray(f.read(moov_size))
+        header = 16 if struct.unpack_from(">I", moov, 0)[0] == 1 else 8
+        # everything between ftyp and the old moov moves down by len(moov)
+        _shift_chunk_offsets(moov, header, len(moov), moov_size)
+
+        ordered = [b for b in boxes if b[0] == b"ftyp"]
+        ordered += [(moov_kind, -1, moov_size)]
+        ordered += [b for b in boxes if b[0] not in (b"ftyp", b"moov")]
+
+        with open(dst, "wb") as out:
+            for kind, offset, size in ordered:
+                if offset < 0:
+                    out.write(moov)
+                    continue
+                f.seek(offset)
+                remaining = size
+                while remaining:
+                    chunk = f.read(min(_COPY_CHUNK, remaining))
+                    out.write(chunk)
+                    remaining -= len(chunk)
+
+
+def playable_path(path) -> str:
+    """
+    `path`, or a cached faststart remux of it when its `moov` is at the end.
+
+    Falls back to the original file if the remux fails.
+    """
+    try:
+        if is_faststart(path):
+            return str(path)
+        target = _FASTSTART_DIR / f"{asset_digest(path)}.mp4"
+        if not target.exists():
+            _FASTSTART_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".part")
+            faststart(path, tmp)
+            os.replace(tmp, target)
+        return str(target)
+    except (OSError, ValueError, struct.error):
+        _LOGGER.exception("Could not remux %s for progressive playback", path)
+        return str(path)
+
+
+# ————————————————————————————————————————————————————————
+# Range route
+# ————————————————————————————————————————————————————————
+def publish(path) -> str:
+    """Register `path` with the route and return its URL name (digest + ext)."""
+    digest = asset_digest(path)
+    name = f"{digest}{Path(path).suffix.lower()}"
+    if name not in _INDEX:
+        abspath = os.path.abspath(playable_path(path))
+        _INDEX[name] = abspath
+        _VERSIONS[abspath] = digest
+    return name
+
+
+class RangeFileHandler(tornado.web.StaticFileHandler):
+    """StaticFileHandler over the published index instead of a directory."""
+
+    CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+    @classmethod
+    def get_absolute_path(cls, root: str, path: str) -> str:
+        return _INDEX.get(path, "")
+
+    def validate_absolute_path(self, root: str, absolute_path: str) -> str | None:
+        if not absolute_path or not os.path.isfile(absolute_path):
+            raise tornado.web.HTTPError(404)
+        return absolute_path
+
+    @classmethod
+    def get_content_version(cls, abspath: str) -> str:
+        # the digest is already known; don't re-hash the file for every ETag
+        return _VERSIONS.get(abspath) or super().get_content_version(abspath)
+
+    def get_content_type(self) -> str:
+        return mime_type(self.absolute_path)
+
+    def get_cache_time(self, path, modified, mime_type) -> int:
+        return self.CACHE_MAX_AGE
+
+    def set_default_headers(self) -> None:
+        # same CORS policy as Streamlit's own /media route (server.enableCORS / corsAllowedOrigins)
+        if allow_all_cross_origin_requests():
+            self.set_header("Access-Control-Allow-Origin", "*")
+        elif is_allowed_origin(origin := self.request.headers.get("Origin")):
+            self.set_header("Access-Control-Allow-Origin", origin)
+
+    def set_extra_headers(self, path: str) -> None:
+        self.set_header("Cache-Control", f"public, max-age={self.CACHE_MAX_AGE}, immutable")
+
+
+def make_app(prefix: str = "/assets") -> tornado.web.Application:
+    """Tornado app serving published files under `prefix`/<digest><ext>."""
+    return tornado.web.Application([
+        (rf"{prefix}/([0-9a-f]+\.[a-z0-9]+)", RangeFileHandler, {"path": os.getcwd()}),
+    ])
+
+
+def start_server(port: int, address: str = "127.0.0.1", base_url: str | None = None) -> str | None:
+    """
+    Run the range route on a background thread (once per process).
+
+    Returns the base URL that asset URLs are built on, or None if the server
+    could not listen (e.g. the port is taken) within 5 seconds. A failure is
+    logged and not retried; callers fall back to Streamlit's media endpoint.
+    """
+    global _server_base_url, _server_failed
+    with _server_lock:
+        if _server_base_url is None and not _server_failed:
+            ready = threading.Event()
+            errors: list[BaseException] = []
+
+            async def serve():
+                try:
+                    make_app().listen(port, address)
+                except Exception as exc:
+                    errors.append(exc)
+                    return
+                finally:
+                    ready.set()
+                await asyncio.Event().wait()
+
+            threading.Thread(target=lambda: asyncio.run(serve()), name="media-server", daemon=True).start()
+            if not ready.wait(timeout=5):
+                errors.append(TimeoutError("media server did not start listening within 5s"))
+            if errors:
+                _server_failed = True
+                _LOGGER.error("Could not serve media on %s:%s, using Streamlit's /media route",
+                              address, port, exc_info=errors[0])
+            else:
+                _server_base_url = (base_url or f"http://{address}:{port}/assets").rstrip("/")
+    return _server_base_url
+
+
+def asset_url(path) -> str | None:
+    """URL on the range route, or None unless MEDIA_SERVER_PORT is set and the server is up."""
+    port = os.environ.get("MEDIA_SERVER_PORT")
+    if not port:
+        return None
+    base = start_server(int(port), base_url=os.environ.get("MEDIA_BASE_URL"))
+    return f"{base}/{publish(path)}" if base else None
+
+
+if __name__ == "__main__":
+    # Serve files for local testing: python -m core.streaming 8765 video.mp4 ...
+    import sys
+
+    port, files = int(sys.argv[1]), sys.argv[2:]
+    for file in files:
+        print(f"http://127.0.0.1:{port}/assets/{publish(file)}  <-  {file}")
+
+    async def main():
+        make_app().listen(port, "127.0.0.1")
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
@@ -1,14 +1,28 @@
 # ./core/utils.py
 
-import base64
 from pathlib import Path
 from typing import Literal
 from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
+import html
 import streamlit as st
 import re
+from core import media, payload
 
 
 
+def begin_page(name: str) -> None:
+    """Reset the per-page asset registry and payload meter; call before rendering a page."""
+    media.reset_page_registry()
+    payload.page_meter().begin_page(name)
+
+
+def end_page() -> None:
+    """Close the page's payload record (total render time)."""
+    payload.page_meter().end_page()
+
+
 def _sanitize_key(key: str) -> str:
     # valid CSS id chars only
     key = re.sub(r'[^a-zA-Z0-9_\-:.]', '-', key)
@@ -25,6 +39,123 @@ def _shadow(level: int) -> str:
     }.get(int(level or 0), "0 8px 24px rgba(0,0,0,.16)")
 
 
+class StyleRegistry:
+    """
+    CSS already sent during the current script run, keyed by content hash.
+
+    Streamlit drops every element a rerun doesn't re-emit, so styles must be
+    sent on each run, but only once: a page with ten cards and ten chip
+    groups ships each shared rule a single time. The registry notices a new
+    run by itself (the run context's `cursors` dict is replaced per run).
+    """
+
+    def __init__(self):
+        self._sent: set[str] = set()
+        self._run = None
+
+    def add(self, css: str) -> bool:
+        """True the first time `css` is seen in this run (i.e. it must be sent)."""
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        run = ctx.cursors if ctx else None
+        if run is None or run is not self._run:
+            self._sent.clear()
+            self._run = run
+        digest = hashlib.sha1(css.encode("utf-8")).hexdigest()[:12]
+        if digest in self._sent:
+            return False
+        self._sent.add(digest)
+        return True
+
+
+def style_registry() -> StyleRegistry:
+    try:
+        return st.session_state.setdefault("style_registry", StyleRegistry())
+    except Exception:
+        return StyleRegistry()  # bare mode
+
+
+def inject_css(css: str, *, element: str = "css") -> None:
+    """Send a `<style>` block, unless the same CSS was already sent this run."""
+    if style_registry().add(css):
+        payload.markdown(f"<style>{css}</style>", element=element)
+
+
+FONTS_CSS = Path("static") / "fonts" / "fonts.css"  # written by `python -m core.build_fonts`
+FONTS_URL = "app/static/fonts"
+PRELOAD_FONTS = ("SpaceGrotesk-VariableFont_wght.woff2",)  # body text: needed for first paint
+
+
+@lru_cache(maxsize=2)
+def _fonts_css(mtime_ns: int) -> str:
+    css = FONTS_CSS.read_text(encoding="utf-8")
+    # an inline <style> resolves url()s against the page, not against fonts.css
+    return re.sub(r'url\("([^"/]+)"\)', rf'url("{FONTS_URL}/\1")', css)
+
+
+def inject_fonts():
+    """
+    Preload the body font and register the subsetted WOFF2 faces with
+    `font-display: swap`, so text renders in a fallback font until they
+    arrive instead of staying invisible. No-op until the font build has run.
+    """
+    try:
+        css = _fonts_css(FONTS_CSS.stat().st_mtime_ns)
+    except OSError:
+        return
+    if style_registry().add(css):
+        links = "".join(
+            f'<link rel="preload" href="{FONTS_URL}/{name}" as="font" type="font/woff2" crossorigin>'
+            for name in PRELOAD_FONTS
+        )
+        payload.markdown(f"{links}<style>{css}</style>", element="inject_fonts")
+
+
+# Shared card rule. Each card's settings arrive as CSS variables; the marker
+# is a direct child of the card's own block, so nested cards style only themselves.
+# Custom properties inherit, so every card declares all of them (unset ones as
+# an explicit reset): a plain card inside an accented one must not pick up its
+# parent's accent, border, filters or outline.
+_CARD_BLOCK = "[data-testid='stVerticalBlock']:has(> [data-testid='stElementContainer'] .cc-card)"
+_CARD_CSS = f"""
+  .cc-card {{ display:none; }}
+
+  {_CARD_BLOCK} {{
+    position: relative;
+    isolation: isolate;               /* keeps shadows independent */
+    z-index: 0;
+    background: var(--cc-bg);
+    color: var(--cc-color);
+    border-radius: var(--cc-radius);
+    padding: var(--cc-padding);
+    margin: var(--cc-margin);
+    box-shadow: var(--cc-shadow);
+    filter: var(--cc-filter);
+    border: var(--cc-border);
+    border-left: var(--cc-accent);
+    transition: transform .18s ease, box-shadow .18s ease, filter .18s ease;
+    overflow: visible;                 /* don't clip shadows */
+    background-clip: padding-box;
+    outline: var(--cc-outline);
+  }}
+
+  {_CARD_BLOCK}:hover {{
+    transform: translateY(calc(-1px * var(--cc-lift)));
+    box-shadow: var(--cc-hover-shadow);
+    filter: var(--cc-hover-filter);
+  }}
+
+  /* remove extra inner padding some Streamlit wrappers add */
+  {_CARD_BLOCK} > div {{ padding: 0 !important; }}
+"""
+
+
+@lru_cache(maxsize=256)
+def _card_class(declarations: str) -> str:
+    return "cc-" + hashlib.sha1(declarations.encode("utf-8")).hexdigest()[:8]
+
+
 @contextmanager
 def custom_container(
         *,
@@ -46,81 +177,78 @@ def custom_container(
     """
     Stable, styled card container that wraps normal Streamlit widgets.
     Use a unique `key` per card and reuse the same key on every run.
+
+    The card rule itself is shared (sent once per run). The style arguments
+    are hashed into a `cc-<hash>` class holding them as CSS variables, so
+    cards with identical settings (e.g. every `project_card`) share one
+    rule and each card adds only a marker.
     """
     sid = _sanitize_key(key)  # stable id per card
     marker_id = f"card-{sid}"
 
+    # every variable gets a value (see _CARD_CSS); currentcolor = the parent's text colour
+    card_vars = {
+        "--cc-bg": bg,
+        "--cc-color": text_color or "currentcolor",
+        "--cc-radius": radius,
+        "--cc-padding": padding,
+        "--cc-margin": margin,
+        "--cc-shadow": _shadow(elevation),
+        "--cc-hover-shadow": _shadow(hover_elevation),
+        "--cc-lift": hover_lift_px,
+        "--cc-filter": "drop-shadow(0 10px 22px rgba(0,0,0,.18))"
+        if force_visible_shadow and elevation > 0 else "none",
+        "--cc-hover-filter": "drop-shadow(0 14px 32px rgba(0,0,0,.22))"
+        if force_visible_shadow and hover_elevation > 0 else "none",
+        "--cc-border": border or "none",
+        "--cc-accent": f"{accent_width} solid {accent}" if accent else (border or "none"),
+        "--cc-outline": "2px dashed #f90" if debug_outline else "none",
+    }
+    declarations = "".join(f"{k}:{v};" for k, v in card_vars.items())
+    style_class = _card_class(declarations)
+
     block = st.container()
     with block:
-        # 1) Insert the marker FIRST so CSS below will match immediately on this run
-        st.markdown(f"<span id='{marker_id}'></span>", unsafe_allow_html=True)
-
-        # 2) Inject CSS that targets ONLY the nearest block containing this marker
-        nearest = (
-            f"[data-testid='stVerticalBlock']"
-            f":has(#{marker_id})"
-            f":not(:has([data-testid='stVerticalBlock'] #{marker_id}))"
+        # 1) Marker FIRST, so the rules below match this block on this run
+        payload.markdown(f"<span id='{marker_id}' class='cc-card {style_class}'></span>",
+                         element="custom_container")
+
+        # 2) Shared rule, then one rule per distinct style; each is sent once per
+        #    run however many cards use it
+        inject_css(_CARD_CSS, element="custom_container")
+        inject_css(
+            f"[data-testid='stVerticalBlock']:has(> [data-testid='stElementContainer'] .{style_class})"
+            f"{{{declarations}}}",
+            element="custom_container",
         )
 
-        st.markdown(f"""
-        <style>
-          #{marker_id} {{ display:none; }}
-
-          {nearest} {{
-            position: relative;
-            isolation: isolate;               /* keeps shadows independent */
-            z-index: 0;
-            background: {bg};
-            {f"color:{text_color};" if text_color else ""}
-            border-radius: {radius};
-            padding: {padding};
-            margin: {margin};
-            box-shadow: {_shadow(elevation)};
-            {"filter: drop-shadow(0 10px 22px rgba(0,0,0,.18));" if force_visible_shadow and elevation > 0 else ""}
-            {f"border:{border};" if border else ""}
-            {f"border-left:{accent_width} solid {accent};" if accent else ""}
-            transition: transform .18s ease, box-shadow .18s ease, filter .18s ease;
-            overflow: visible;                 /* don't clip shadows */
-            background-clip: padding-box;
-            {"outline: 2px dashed #f90;" if debug_outline else ""}
-          }}
-
-          {nearest}:hover {{
-            transform: translateY(-{hover_lift_px}px);
-            box-shadow: {_shadow(hover_elevation)};
-            {"filter: drop-shadow(0 14px 32px rgba(0,0,0,.22));" if force_visible_shadow and hover_elevation > 0 else ""}
-          }}
-
-          /* remove extra inner padding some Streamlit wrappers add */
-          {nearest} > div {{ padding: 0 !important; }}
-        </style>
-        """, unsafe_allow_html=True)
-
         yield block
 
 
+_CHIP_CSS = """
+  .chip-wrap{display:flex;flex-wrap:wrap;gap:6px;row-gap:8px;align-items:center;margin:.25rem 0 .35rem 0;}
+  .chip{display:inline-flex;align-items:center;gap:.4rem;padding:.28rem .6rem;border-radius:999px;
+        font-size:.85rem;line-height:1;background:#f2f2f2;color:#333;border:1px solid rgba(0,0,0,.08);white-space:nowrap;}
+  .chip.sm{font-size:.75rem;padding:.2rem .5rem;}
+  .chip.lg{font-size:.95rem;padding:.38rem .75rem;}
+  .chip.alt{background:#fff4e5;color:#8a4b00;border-color:#ffd7a8;}
+  .chip.ok{background:#e7f7ef;color:#116b3a;border-color:#bfe8d2;}
+  .chip.info{background:#eef6ff;color:#0b5cad;border-color:#cfe3ff;}
+  .chip.warn{background:#fff7e6;color:#a15a00;border-color:#ffe0b3;}
+  .chip.dark{background:#2f2f2f;color:#f2f2f2;border-color:#00000033;}
+  .chip.line{background:transparent;color:#555;border-color:#ccc;}
+  .chip .ico{font-style:normal;opacity:.9;}
+"""
+
+
+@payload.metered
 def inject_chip_css():
-    st.markdown("""
-    <style>
-      .chip-wrap{display:flex;flex-wrap:wrap;gap:6px;row-gap:8px;align-items:center;margin:.25rem 0 .35rem 0;}
-      .chip{display:inline-flex;align-items:center;gap:.4rem;padding:.28rem .6rem;border-radius:999px;
-            font-size:.85rem;line-height:1;background:#f2f2f2;color:#333;border:1px solid rgba(0,0,0,.08);white-space:nowrap;}
-      .chip.sm{font-size:.75rem;padding:.2rem .5rem;}
-      .chip.lg{font-size:.95rem;padding:.38rem .75rem;}
-      .chip.alt{background:#fff4e5;color:#8a4b00;border-color:#ffd7a8;}
-      .chip.ok{background:#e7f7ef;color:#116b3a;border-color:#bfe8d2;}
-      .chip.info{background:#eef6ff;color:#0b5cad;border-color:#cfe3ff;}
-      .chip.warn{background:#fff7e6;color:#a15a00;border-color:#ffe0b3;}
-      .chip.dark{background:#2f2f2f;color:#f2f2f2;border-color:#00000033;}
-      .chip.line{background:transparent;color:#555;border-color:#ccc;}
-      .chip .ico{font-style:normal;opacity:.9;}
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css(_CHIP_CSS)
 
 
+@payload.metered
 def chips(items, *, variant="default", size="md", container=None, wrap=True):
-    inject_chip_css()  # ← inject EVERY run
-    target = container or st
+    inject_chip_css()  # ← sent once per run, however many chip groups
 
     def one(item):
         if isinstance(item, str):
@@ -138,7 +266,7 @@ def chips(items, *, variant="default", size="md", container=None, wrap=True):
     html = "".join(one(i) for i in items)
     if wrap:
         html = f"<div class='chip-wrap'>{html}</div>"
-    target.markdown(html, unsafe_allow_html=True)
+    payload.markdown(html, container)
 
 
 # @contextmanager
@@ -189,6 +317,7 @@ def chips(items, *, variant="default", size="md", container=None, wrap=True):
 #         yield block
 
 
+@payload.metered
 def custom_write(
         text: str,
         type: Literal['h1', 'h2', 'h3', 'h4', 'h5', 'para', 'caption'] = 'para',
@@ -222,9 +351,10 @@ def custom_write(
     </div>
     """
 
-    st.markdown(html, unsafe_allow_html=True)
+    payload.markdown(html)
 
 
+@payload.metered
 def overlay_image_with_text(png_file, text="Hello, I’m Jigar"):
     bin_str = get_base64(png_file)
     html_code = f"""
@@ -257,15 +387,14 @@ def overlay_image_with_text(png_file, text="Hello, I’m Jigar"):
         <div class="overlay-text">{text}</div>
     </div>
     """
-    st.markdown(html_code, unsafe_allow_html=True)
+    payload.markdown(html_code)
 
 
 def get_base64(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+    return media.encoded_cache.get(bin_file)
 
 
+@payload.metered
 def set_background(png_file):
     bin_str = get_base64(png_file)
     page_bg_img = f'''
@@ -278,73 +407,128 @@ def set_background(png_file):
     }}
     </style>
     '''
-    st.markdown(page_bg_img, unsafe_allow_html=True)
+    payload.markdown(page_bg_img)
 
 
+@payload.metered
 def display_gif(local_path: str):
-    file_ = open(local_path, "rb")
-    contents = file_.read()
-    data_url = base64.b64encode(contents).decode("utf-8")
-    file_.close()
-
-    st.markdown(
-        f'<img src="data:image/gif;base64,{data_url}" alt="cat gif">',
-        unsafe_allow_html=True,
-    )
+    data_url = media.data_uri(local_path, "image/gif")
+
+    payload.markdown(f'<img src="{data_url}" alt="cat gif">')
 
 
+@payload.metered
 def hero_video(
         path: str,
         *,
         max_width_px: int = 900,  # target max width on desktop
         center: bool = True,
         mp4_path: str | None = None,  # optional iOS/Safari fallback
-        poster: str | None = None  # optional poster image path
+        poster: str | None = None,  # optional poster image path
+        controls: bool = False,  # show the seek bar (long clips)
+        lazy: bool = False,  # below the fold: poster only until clicked
+        alt: str = ""  # accessible text, sent as aria-label/title
 ):
-    # Base64 for WEBM
-    webm_b64 = base64.b64encode(Path(path).read_bytes()).decode("utf-8")
-    webm_src = f"data:video/webm;base64,{webm_b64}"
-
-    # Optional MP4 fallback (helps on iOS Safari)
-    mp4_tag = ""
-    if mp4_path:
-        mp4_b64 = base64.b64encode(Path(mp4_path).read_bytes()).decode("utf-8")
-        mp4_src = f"data:video/mp4;base64,{mp4_b64}"
-        mp4_tag = f'<source src="{mp4_src}" type="video/mp4"/>'
+    """
+    Autoplaying, looping, muted video scaled to fit the column.
+
+    Files are served from the media endpoint by content hash (see `core.media`),
+    so the browser caches them and reruns only resend the <video> tag.
+    Sources are de-duplicated through the page's asset registry: passing the
+    same file as `path` and `mp4_path` (or embedding the same clip in several
+    cards) publishes it once and emits a single <source>.
+
+    The media routes answer Range requests and MP4s are remuxed with `moov`
+    first, so playback starts after the first few hundred KB and seeking
+    (with `controls=True`) only fetches what it needs.
+
+    If `python -m core.build_assets` has produced renditions for `path`, the
+    smallest one at least `max_width_px` wide is used (and its poster, unless
+    one is given).
+
+    `lazy=True` renders a poster placeholder sized to the clip and fetches
+    nothing (`preload="none"`, no autoplay) until the visitor presses play.
+    Browsers ignore `preload="none"` on an autoplaying video and st.markdown
+    cannot run scripts, so there is no lazy autoplay or play-on-scroll. A clip
+    without a poster preloads its metadata instead, so the box shows the
+    first frame rather than nothing. Lazy mode only saves bytes on the URL
+    routes, not in the data-URI fallback.
+    """
+    registry = media.page_registry()
+    candidates = [path, mp4_path]  # mp4_path: optional iOS/Safari fallback
+    best = media.video_rendition(path, max_width_px)
+    if best:
+        candidates = [best["webm"], best["mp4"]]
+    entry = media.lookup(path)
+    if poster is None and entry:
+        poster = entry.get("poster")
+
+    sources, seen = [], set()
+    for src_path in candidates:
+        if not src_path:
+            continue
+        digest = media.asset_digest(src_path)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        sources.append(f'<source src="{registry.src(src_path)}" type="{media.mime_type(src_path)}"/>')
+    source_tags = "\n            ".join(sources)
 
     margin = "display:block; margin:0 auto;" if center else ""
+    if poster and Path(poster).is_file():
+        poster = registry.src(poster)
     poster_attr = f'poster="{poster}"' if poster else ""
+    label_attr = f'aria-label="{html.escape(alt, quote=True)}" title="{html.escape(alt, quote=True)}"' if alt else ""
+    if lazy:
+        # no poster: an unloaded <video> is an empty box, so fetch enough for the first frame
+        playback = f'controls preload="{"none" if poster else "metadata"}"'
+    else:
+        playback = f'{"controls" if controls else ""} autoplay preload="metadata"'
+    # reserve the clip's box up front so the placeholder doesn't shift the layout
+    ratio = f"aspect-ratio:{entry['width']}/{entry['height']}; " if entry and entry.get("height") else ""
+    placeholder = "background:#ecebe3; " if lazy and poster else ""
 
     # Key: width scales down on mobile, never exceeds max_width_px on desktop
     # No cropping: height:auto; object-fit:contain;
     style = (
         f"max-width:100%; width:min(100%, {max_width_px}px); "
-        f"height:auto; object-fit:contain; {margin}"
+        f"height:auto; {ratio}{placeholder}object-fit:contain; {margin}"
     )
 
-    st.markdown(
+    payload.markdown(
         f"""
-        <video {poster_attr}
-               autoplay loop muted playsinline preload="metadata"
+        <video {poster_attr} {playback} {label_attr}
+               loop muted playsinline
                style="{style}">
-            <source src="{webm_src}" type="video/webm"/>
-            {mp4_tag}
+            {source_tags}
             <!-- Fallback text -->
             Your browser does not support the video tag.
         </video>
-        """,
-        unsafe_allow_html=True
+        """
     )
 
 
-def center_gif(path: str, max_width_px: int = 480, alt: str = ""):
-    b64 = base64.b64encode(Path(path).read_bytes()).decode()
-    st.markdown(
+@payload.metered
+def center_gif(path: str, max_width_px: int = 480, alt: str = "", lazy: bool = False):
+    """
+    Centered GIF. When the asset build has transcoded it to video, the much
+    smaller WEBM/MP4 rendition is shown instead (looping, muted, like a GIF).
+
+    `lazy=True` defers the download of a GIF/image until it nears the
+    viewport (`loading="lazy"`). It does not apply to a video rendition: that
+    must autoplay to behave like a GIF, and browsers load autoplaying video
+    up front (it is already a fraction of the GIF's size).
+    """
+    if media.video_rendition(path, max_width_px):
+        return hero_video(path, max_width_px=max_width_px, alt=alt)
+
+    src = media.page_registry().src(media.rendition_path(path, max_width_px))
+    loading = 'loading="lazy" decoding="async"' if lazy else ""
+    payload.markdown(
         f"""
-        <img src="data:image/gif;base64,{b64}"
-             alt="{alt}"
+        <img src="{src}" {loading}
+             alt="{html.escape(alt, quote=True)}"
              style="display:block;margin:0 auto;max-width:100%;
                     width:min(100%, {max_width_px}px);height:auto;" />
-        """,
-        unsafe_allow_html=True
+        """
     )
@@ -1,5 +1,6 @@
 import streamlit as st
 import sections
+from core import utils
 
 
 def config(page_title='Astrojigs Portfolio'):
@@ -12,6 +13,7 @@ def config(page_title='Astrojigs Portfolio'):
 
 def main():
     config()
+    utils.inject_fonts()
     st.logo("./core/references/images/astrojigs logo.png")
 
     # ------------------- Pages ---------------------------
@@ -48,7 +50,11 @@ def main():
     }
 
     pg = st.navigation(pages, position="top", expanded=True)
-    pg.run()  # <- do not manually call your render() functions elsewhere
+    utils.begin_page(pg.url_path)  # assets and payload are tracked per rendered page
+    try:
+        pg.run()  # <- do not manually call your render() functions elsewhere
+    finally:
+        utils.end_page()  # close the record even when the page raises
 
 
 if __name__ == '__main__':
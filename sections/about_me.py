@@ -1,5 +1,5 @@
 import streamlit as st
-from core import utils
+from core import utils, media
 import pandas as pd
 
 from core.cards import project_card
@@ -189,7 +189,7 @@ def render():
     # Header block (image + intro)
     col_img, col_text = st.columns([1, 2])
     with col_img:
-        st.image("./core/references/images/ProfilePic no background.png", width=400)
+        st.image(media.rendition_path("./core/references/images/ProfilePic no background.png", 400), width=400)
 
     with col_text:
         with custom_container(key='Intro'):
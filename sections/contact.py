@@ -2,6 +2,7 @@
 import streamlit as st
 from urllib.parse import quote_plus
 from st_social_media_links import SocialMediaIcons
+from core import media
 from core.utils import custom_write, chips, custom_container, center_gif
 from urllib.parse import urlencode, quote
 
@@ -73,7 +74,7 @@ def render():
             with card:
                 a, b = st.columns([0.38, 0.62], vertical_alignment="center")
                 with a:
-                    st.image(avatar_path, use_container_width=True)
+                    st.image(media.rendition_path(avatar_path, 480), use_container_width=True)
                 with b:
                     st.markdown("### Jigar Patel")
                     st.markdown("Data Analyst · Python Developer")
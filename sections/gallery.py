@@ -1,5 +1,5 @@
 import streamlit as st
-from core.utils import custom_container, custom_write, hero_video
+from core.utils import custom_container, custom_write, hero_video, center_gif
 from core.examples import dublin_proximity_gis, complex_radar_chart
 
 
@@ -37,7 +37,7 @@ def render():
             rl_repo_link = "https://github.com/Astrojigs/LunarLander-Agent"
             custom_write("Reinforcement Learning - Lunar Lander", color='gray', type='h4')
             st.page_link(rl_repo_link, label="🪄 :red[Link to Repository]", icon=":material/cognition:")
-            st.image("./core/references/gifs/reinforcement learning example.gif")
+            center_gif("./core/references/gifs/reinforcement learning example.gif", max_width_px=600)
 
     # with c2:
     with custom_container(key="Barnes-Hut Example"):
@@ -50,12 +50,14 @@ def render():
         with sub_c1:
             custom_write("<b>Example 1</b> (<i>without Quadtree</i>)")
             hero_video("./core/references/Project Files/Barnes-Hut/compressed/ep9600_compressed.mp4",
-                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep9600_compressed.mp4")
+                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep9600_compressed.mp4",
+                       lazy=True)
         with sub_c2:
 
             custom_write("<b>Example 2</b> (<i>with Quadtree</i>)")
             hero_video('./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4',
-                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4")
+                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4",
+                       lazy=True)
 
     # more example coming in
     custom_write('More examples coming in...', type='h4', color='gray')
@@ -1,7 +1,6 @@
 import streamlit as st
 from core.utils import custom_container, custom_write, chips, hero_video
 from pathlib import Path
-import matplotlib.pyplot as plt
 
 
 # simple quadtree schematic (no external image needed)
@@ -9,6 +8,8 @@ import matplotlib.pyplot as plt
 # Simple quadtree schematic (no external image needed)
 # ————————————————————————————————————————————————————————
 def draw_quadtree_schematic(levels: int = 3):
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(4.5, 4.5))
     ax.set_aspect("equal");
     ax.axis("off")
@@ -241,10 +242,11 @@ def render():
         c1, c2 = st.columns([1, 1])
         with c1:
             hero_video("./core/references/Project Files/Barnes-Hut/ep2_web.mp4",
-                       mp4_path="./core/references/Project Files/Barnes-Hut/ep2_web.mp4")
+                       mp4_path="./core/references/Project Files/Barnes-Hut/ep2_web.mp4", lazy=True)
         with c2:
             hero_video('./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4',
-                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4")
+                       mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep2_quadtree_compressed.mp4",
+                       lazy=True)
 
     # ————————————————————————————————————————————————————————————————
     # 6) Tuning & gotchas
@@ -273,5 +275,5 @@ def render():
             custom_write("Barnes-Hut Algorithm in action (Example 2)", color="gray", type="h5")
             hero_video('./core/references/Project Files/Barnes-Hut/compressed/ep9600_compressed.mp4',
                        mp4_path="./core/references/Project Files/Barnes-Hut/compressed/ep9600_compressed.mp4",
-                       max_width_px=400)
+                       max_width_px=400, lazy=True)
     # custom_write("<i>More details coming in soon</i>...", color='gray')
@@ -4,7 +4,6 @@ import io
 from functools import lru_cache
 from typing import Dict, List
 
-import requests
 from PIL import Image
 import streamlit as st
 
@@ -25,6 +24,8 @@ def load_image_from_url(url: str) -> Image.Image:
     Returns:
         A PIL Image object containing the requested image.
     """
+    import requests
+
     try:
         response = requests.get(url, timeout=10)
         response.raise_for_status()
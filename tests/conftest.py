@@ -0,0 +1,7 @@
+# ./tests/conftest.py
+"""Run from the repo root: ``python -m pytest``. Makes `core`/`sections` importable from any cwd."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,116 @@
+# ./tests/test_charts.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_echarts import Map
+
+from core import charts
+from core.charts import _top_n_other, build_bar_option, histogram_stream
+
+
+def _with_real_other() -> pd.DataFrame:
+    # "Other" is a genuine category and large enough to be kept by top_n=2
+    return pd.DataFrame({
+        "cat": ["A", "A", "Other", "Other", "B", "B", "C"],
+        "hue": ["x", "y", "x", "y", "x", "y", "x"],
+        "val": [60.0, 40.0, 30.0, 20.0, 4.0, 1.0, 3.0],
+    })
+
+
+def test_bar_hue_fold_into_existing_other_lists_it_once():
+    df = _with_real_other()
+    option = build_bar_option(df, x="cat", y="val", hue="hue", top_n=2)
+
+    assert option["xAxis"]["data"] == ["A", "Other"]
+    series = {s["name"]: s["data"] for s in option["series"]}
+    # B and C are folded into the real "Other" row, not a second bar
+    assert series == {"x": [60.0, 37.0], "y": [40.0, 21.0]}
+    assert sum(map(sum, series.values())) == df["val"].sum()
+
+
+def test_bar_hue_fold_appends_other_when_not_kept():
+    df = _with_real_other().replace({"cat": {"Other": "D"}})
+    option = build_bar_option(df, x="cat", y="val", hue="hue", top_n=2)
+
+    assert option["xAxis"]["data"] == ["A", "D", "Other"]
+    series = {s["name"]: s["data"] for s in option["series"]}
+    assert series == {"x": [60.0, 30.0, 7.0], "y": [40.0, 20.0, 1.0]}
+
+
+def test_top_n_other_merges_into_existing_other():
+    df = _with_real_other()
+    totals = _top_n_other(df["cat"], df["val"], top_n=2)
+
+    assert totals.to_dict() == {"A": 100.0, "Other": 58.0}
+
+
+@pytest.mark.parametrize("missing", [None, np.nan])
+@pytest.mark.parametrize("dtype", [object, "category"])
+def test_bar_fold_treats_missing_category_alike_with_and_without_hue(missing, dtype):
+    df = _with_real_other().replace({"cat": {"Other": "D"}})
+    df.loc[df["cat"] == "D", "cat"] = missing
+    df["cat"] = df["cat"].astype(dtype)
+
+    plain = build_bar_option(df, x="cat", y="val", top_n=2)
+    hued = build_bar_option(df, x="cat", y="val", hue="hue", top_n=2)
+
+    # the missing category is large enough to be kept, as its own bar
+    assert plain["xAxis"]["data"] == hued["xAxis"]["data"] == ["A", "nan", "Other"]
+    assert plain["series"][0]["data"] == [100.0, 50.0, 8.0]
+    assert {s["name"]: s["data"] for s in hued["series"]} == {"x": [60.0, 30.0, 7.0], "y": [40.0, 20.0, 1.0]}
+
+
+def test_bar_fold_folds_small_missing_category():
+    df = _with_real_other().replace({"cat": {"Other": "D", "C": None}})
+    plain = build_bar_option(df, x="cat", y="val", top_n=2)
+    hued = build_bar_option(df, x="cat", y="val", hue="hue", top_n=2)
+
+    assert plain["xAxis"]["data"] == hued["xAxis"]["data"] == ["A", "D", "Other"]
+    assert plain["series"][0]["data"] == [100.0, 50.0, 8.0]
+
+
+def _read_chunks(values, log):
+    for chunk in values:
+        log.append(chunk)
+        yield np.asarray(chunk, dtype=float)
+
+
+def test_histogram_stream_rejects_one_shot_iterator_before_reading():
+    log = []
+    with pytest.raises(TypeError, match="one-shot"):
+        histogram_stream(_read_chunks([[1, 2], [3]], log), "value", bins=3)
+    assert log == []
+
+
+def test_histogram_stream_one_shot_iterator_with_known_edges():
+    values = [[1, 2, np.nan], [3, 4]]
+    expected = np.histogram([1, 2, 3, 4], bins=3, range=(1, 4))
+    for kwargs in ({"bins": 3, "range": (1, 4)}, {"bins": expected[1]}):
+        counts, edges = histogram_stream(_read_chunks(values, []), "value", **kwargs)
+        assert counts.tolist() == expected[0].tolist() and np.allclose(edges, expected[1])
+    # re-iterable input may take the min/max pass
+    counts, _ = histogram_stream(lambda: _read_chunks(values, []), "value", bins=3)
+    assert counts.tolist() == expected[0].tolist()
+
+
+def _square_map(name="area", size=1.0) -> Map:
+    ring = [[0.123456789, 0.0], [size, 0.0], [size, size], [0.0, size], [0.123456789, 0.0]]
+    feature = {"type": "Feature", "properties": {"name": "sq"}, "geometry": {"type": "Polygon", "coordinates": [ring]}}
+    return Map(name, {"type": "FeatureCollection", "features": [feature]})
+
+
+def test_compacted_map_is_keyed_on_contents_and_bounded(monkeypatch):
+    monkeypatch.setattr(charts, "_compact_maps", charts.OrderedDict())
+    monkeypatch.setattr(charts, "_COMPACT_MAPS_MAX", 3)
+
+    first = charts._compact_map(_square_map(), 4)
+    # an equal Map rebuilt on a rerun reuses the entry instead of adding one
+    assert charts._compact_map(_square_map(), 4) is first
+    assert first.geo_json["features"][0]["geometry"]["coordinates"][0][0] == [0.1235, 0.0]
+    assert charts._compact_map(_square_map(), 6) is not first
+    assert charts._compact_map(_square_map(size=2.0), 4) is not first
+
+    for size in range(3, 10):
+        charts._compact_map(_square_map(size=float(size)), 4)
+    assert len(charts._compact_maps) == 3
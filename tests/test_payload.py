@@ -0,0 +1,23 @@
+# ./tests/test_payload.py
+import itertools
+
+from core import payload
+from core.payload import PayloadMeter
+
+
+def test_nested_elements_report_self_time(monkeypatch):
+    clock = itertools.count()  # every perf_counter() call advances one second
+    monkeypatch.setattr(payload.time, "perf_counter", lambda: float(next(clock)))
+    meter = PayloadMeter()
+    meter.begin_page("page")                 # t=0
+    outer = meter.open("center_gif")         # t=1
+    inner = meter.open("hero_video")         # t=2
+    meter.count(100)
+    meter.close(inner)                       # t=3: inner took 1s
+    meter.close(outer)                       # t=4: outer took 3s, 1s of it inside hero_video
+    meter.end_page()                         # t=5
+
+    seconds = {element: secs for element, _, _, secs in meter.breakdown()}
+    assert seconds == {"center_gif": 2.0, "hero_video": 1.0}
+    assert meter.total() == 100
+    assert sum(seconds.values()) <= meter.page_seconds["page"]
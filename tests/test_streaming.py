@@ -0,0 +1,108 @@
+# ./tests/test_streaming.py
+import socket
+import struct
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from tornado.testing import AsyncHTTPTestCase, bind_unused_port
+
+from core import streaming
+
+MEDIA = bytes(range(256)) * 4
+
+
+def _box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def write_moov_last_mp4(path: Path) -> None:
+    """Minimal MP4 laid out ftyp, mdat, moov, whose one stco entry points at the first media byte."""
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2mp41")
+    mdat = _box(b"mdat", MEDIA)
+    stco = _box(b"stco", struct.pack(">III", 0, 1, len(ftyp) + 8))  # version/flags, count, offset
+    moov = _box(b"moov", _box(b"trak", _box(b"mdia", _box(b"minf", _box(b"stbl", stco)))))
+    path.write_bytes(ftyp + mdat + moov)
+
+
+def _chunk_offset(data: bytes) -> int:
+    at = data.index(b"stco")  # box type; version/flags and count follow, then the first entry
+    return struct.unpack_from(">I", data, at + 12)[0]
+
+
+class RangeRouteTest(AsyncHTTPTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        self._patches = [mock.patch.object(streaming, "_FASTSTART_DIR", tmp / "faststart"),
+                         mock.patch.dict(streaming._INDEX), mock.patch.dict(streaming._VERSIONS)]
+        for patch in self._patches:
+            patch.start()
+        self.source = tmp / "clip.mp4"
+        write_moov_last_mp4(self.source)
+        self.name = streaming.publish(self.source)
+        self.served = Path(streaming._INDEX[self.name]).read_bytes()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._tmp.cleanup()
+
+    def get_app(self):
+        return streaming.make_app()
+
+    def test_full_get(self):
+        response = self.fetch(f"/assets/{self.name}")
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.body, self.served)
+
+    def test_range_get(self):
+        response = self.fetch(f"/assets/{self.name}", headers={"Range": "bytes=0-99"})
+        self.assertEqual(response.code, 206)
+        self.assertEqual(response.headers["Content-Range"], f"bytes 0-99/{len(self.served)}")
+        self.assertEqual(response.headers["Content-Type"], "video/mp4")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertEqual(response.body, self.served[:100])
+
+    def test_no_cross_origin_header_by_default(self):
+        # Streamlit's defaults: CORS protection on, no allowlisted origins
+        response = self.fetch(f"/assets/{self.name}", headers={"Origin": "https://elsewhere.example"})
+        self.assertEqual(response.code, 200)
+        self.assertNotIn("Access-Control-Allow-Origin", response.headers)
+
+    def test_cross_origin_follows_streamlit_config(self):
+        with mock.patch.object(streaming, "allow_all_cross_origin_requests", return_value=True):
+            response = self.fetch(f"/assets/{self.name}")
+        self.assertEqual(response.headers["Access-Control-Allow-Origin"], "*")
+
+    def test_unknown_name(self):
+        response = self.fetch("/assets/0123456789abcdef.mp4")
+        self.assertEqual(response.code, 404)
+
+    def test_published_mp4_is_remuxed_faststart(self):
+        remuxed = streaming._INDEX[self.name]
+        self.assertFalse(streaming.is_faststart(self.source))
+        self.assertNotEqual(Path(remuxed), self.source.resolve())
+        self.assertTrue(streaming.is_faststart(remuxed))
+        # the media bytes are unchanged and the chunk offset follows them
+        offset = _chunk_offset(self.served)
+        self.assertEqual(self.served[offset:offset + len(MEDIA)], MEDIA)
+        self.assertEqual(len(self.served), self.source.stat().st_size)
+
+
+def test_port_in_use_falls_back_to_media_route(monkeypatch, tmp_path):
+    taken, port = bind_unused_port()
+    taken.listen(socket.SOMAXCONN)
+    monkeypatch.setattr(streaming, "_server_base_url", None)
+    monkeypatch.setattr(streaming, "_server_failed", False)
+    monkeypatch.setenv("MEDIA_SERVER_PORT", str(port))
+    clip = tmp_path / "clip.mp4"
+    write_moov_last_mp4(clip)
+    try:
+        assert streaming.start_server(port) is None
+        assert streaming._server_base_url is None and streaming._server_failed
+        assert streaming.asset_url(clip) is None  # core.media then publishes on /media
+    finally:
+        taken.close()
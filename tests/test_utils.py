@@ -0,0 +1,103 @@
+# ./tests/test_utils.py
+import re
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+CARD_VARS = ["--cc-bg", "--cc-color", "--cc-radius", "--cc-padding", "--cc-margin", "--cc-shadow",
+             "--cc-hover-shadow", "--cc-lift", "--cc-filter", "--cc-hover-filter", "--cc-border",
+             "--cc-accent", "--cc-outline"]
+
+
+def _nested_cards():
+    import streamlit as st
+    from core.utils import custom_container
+
+    with custom_container(key="outer", accent="#f90", border="1px solid #ddd", debug_outline=True):
+        with custom_container(key="inner", elevation=0, hover_elevation=0, force_visible_shadow=False):
+            st.write("inner")
+    with custom_container(key="plain", elevation=0, hover_elevation=0, force_visible_shadow=False):
+        st.write("top level")
+
+
+def _card_rules(at: AppTest) -> tuple[dict, dict]:
+    """marker id -> cc-<hash> class, and cc-<hash> class -> its declarations."""
+    markers, rules = {}, {}
+    for md in at.markdown:
+        for marker_id, cls in re.findall(r"<span id='(card-[^']+)' class='cc-card (cc-[0-9a-f]+)'>", md.value):
+            markers[marker_id] = cls
+        for cls, body in re.findall(r"\.(cc-[0-9a-f]+)\)\{([^}]*)\}", md.value):
+            rules[cls] = dict(d.split(":", 1) for d in body.split(";") if d)
+    return markers, rules
+
+
+def test_nested_plain_card_resets_every_variable():
+    at = AppTest.from_function(_nested_cards).run()
+    assert not at.exception
+    markers, rules = _card_rules(at)
+
+    outer, inner = rules[markers["card-outer"]], rules[markers["card-inner"]]
+    assert list(outer) == CARD_VARS and list(inner) == CARD_VARS
+    assert outer["--cc-accent"] == "4px solid #f90"
+    # nothing the outer card sets may leak into the inner one through inheritance
+    assert inner["--cc-accent"] == inner["--cc-border"] == inner["--cc-outline"] == "none"
+    assert inner["--cc-filter"] == inner["--cc-hover-filter"] == "none"
+    assert inner["--cc-color"] == "currentcolor"
+
+
+def test_same_settings_share_one_class_nested_or_not():
+    at = AppTest.from_function(_nested_cards).run()
+    markers, rules = _card_rules(at)
+
+    # the class fully describes the card, so the nested and top-level copies can share it
+    assert markers["card-inner"] == markers["card-plain"]
+    assert markers["card-outer"] != markers["card-inner"]
+    assert len(rules) == 2
+
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _videos():
+    from core.utils import center_gif, hero_video
+
+    gif = "./core/references/gifs/reinforcement learning example.gif"  # has WEBM/MP4 renditions and a poster
+    clip = "./core/references/build/reinforcement-learning-example-988d723f-480w.mp4"  # no manifest entry
+    center_gif(gif, max_width_px=600, alt="gif", lazy=True)
+    hero_video(clip, lazy=True, alt="no poster")
+    hero_video(gif, lazy=True, alt="poster")
+
+
+def _video_tag(at: AppTest, alt: str) -> str:
+    return next(re.search(r"<video[^>]*>", md.value, re.S).group(0)
+                for md in at.markdown if f'aria-label="{alt}"' in md.value)
+
+
+def test_lazy_video_modes(monkeypatch):
+    monkeypatch.chdir(REPO)
+    at = AppTest.from_function(_videos).run()
+    assert not at.exception
+
+    gif = _video_tag(at, "gif")  # a transcoded GIF always plays like one
+    assert "autoplay" in gif and "loop" in gif and "controls" not in gif
+
+    no_poster = _video_tag(at, "no poster")  # no empty placeholder box: the first frame is fetched
+    assert 'preload="metadata"' in no_poster and "autoplay" not in no_poster
+    assert "poster=" not in no_poster and "background:#ecebe3" not in no_poster
+
+    deferred = _video_tag(at, "poster")
+    assert 'preload="none"' in deferred and "autoplay" not in deferred and "poster=" in deferred
+
+
+def _quoted_alt_image():
+    from core.utils import center_gif
+
+    center_gif("./core/references/images/astrojigs logo.png", alt='Say "hi" <b>now</b>')  # no video rendition
+
+
+def test_img_alt_is_escaped(monkeypatch):
+    monkeypatch.chdir(REPO)
+    at = AppTest.from_function(_quoted_alt_image).run()
+    assert not at.exception
+    img = next(md.value for md in at.markdown if "<img" in md.value)
+    assert 'alt="Say &quot;hi&quot; &lt;b&gt;now&lt;/b&gt;"' in img